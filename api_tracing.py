@@ -0,0 +1,209 @@
+"""
+api_tracing.py
+--------------
+
+Request-level tracing of the calls setup.py, capture.py and removeFramework.py
+make to the XSIAM tenant. The scripts send their requests through SESSION,
+which records the endpoint, status, latency, bytes and attempt of each call
+in TRACER. SESSION is also rate limited by rate_limiting.LIMITER. At the end
+of a run, report() prints the endpoints the run spent its time on and, when
+API_TRACE_FILE is set, writes every call to that JSON file.
+
+    from api_tracing import SESSION, report
+    response = SESSION.post(url=..., headers=headers, json=body)
+    # a call holding an identifier in its path, and the second try of a call
+    response = SESSION.delete(url=f".../jobs/{job_id}", endpoint="/xsoar/public/v1/jobs/{id}", attempt=2)
+    report()
+
+The pack scripts record their core-api-* calls the same way, with the
+ApiTracer of POVContentApiModule.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from rate_limiting import LIMITER, RateLimiter
+
+# Times a request throttled by the tenant (429) is retried, after its Retry-After or 1, 2, 4... seconds
+THROTTLED_RETRIES = 3
+
+
+class ApiTracer:
+    """Thread-safe record of the API calls of a run."""
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def record(self, method: str, endpoint: str, status: Optional[int], started: float, bytes_sent: int = 0,
+               bytes_received: int = 0, attempt: int = 1, error: Any = None, wait_ms: float = 0.0) -> None:
+        """
+        Records a call
+
+        :param endpoint: str, path of the call, without its query string
+        :param status: int, HTTP status code of the response, None when no response was received
+        :param started: float, time.perf_counter() when the call was sent
+        :param attempt: int, 1 for the first try of a call, incremented by the callers that retry it
+        :param wait_ms: float, time the call waited for the rate limiter before it was sent
+        """
+        now = time.perf_counter()
+        call = {
+            "endpoint": f"{method.upper()} {endpoint}",
+            "status": status,
+            "offset_ms": round((started - self._start) * 1000, 1),
+            "latency_ms": round((now - started) * 1000, 1),
+            "bytes_sent": bytes_sent,
+            "bytes_received": bytes_received,
+            "attempt": attempt,
+            "error": str(error)[:500] if error else None,
+            "wait_ms": round(wait_ms, 1),
+        }
+        with self._lock:
+            self.calls.append(call)
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+        return {
+            "calls": len(calls),
+            "errors": sum(1 for call in calls if call["error"]),
+            "retries": sum(1 for call in calls if call["attempt"] > 1),
+            "call_ms": round(sum(call["latency_ms"] for call in calls), 1),
+            "wait_ms": round(sum(call["wait_ms"] for call in calls), 1),
+            "wall_ms": round((time.perf_counter() - self._start) * 1000, 1),
+        }
+
+    def summary(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        The calls aggregated by endpoint, the endpoints with the most total time first
+
+        :param top: int, number of endpoints to return, all of them by default
+        """
+        with self._lock:
+            calls = list(self.calls)
+
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            row = endpoints.setdefault(call["endpoint"], {
+                "endpoint": call["endpoint"], "calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "bytes_sent": 0, "bytes_received": 0,
+            })
+            row["calls"] += 1
+            row["errors"] += 1 if call["error"] else 0
+            row["retries"] += 1 if call["attempt"] > 1 else 0
+            row["total_ms"] += call["latency_ms"]
+            row["max_ms"] = max(row["max_ms"], call["latency_ms"])
+            row["bytes_sent"] += call["bytes_sent"]
+            row["bytes_received"] += call["bytes_received"]
+
+        rows = sorted(endpoints.values(), key=lambda row: row["total_ms"], reverse=True)[:top]
+        for row in rows:
+            row["total_ms"] = round(row["total_ms"], 1)
+            row["avg_ms"] = round(row["total_ms"] / row["calls"], 1)
+        return rows
+
+    def print_summary(self, top: Optional[int] = 10) -> None:
+        totals = self.totals()
+        if not totals["calls"]:
+            return
+
+        print(f"\n---API calls: {totals['calls']} in {totals['call_ms'] / 1000:.1f} s over a "
+              f"{totals['wall_ms'] / 1000:.1f} s run, {totals['errors']} failed, {totals['retries']} retried, "
+              f"{totals['wait_ms'] / 1000:.1f} s waiting on the rate limiter\n")
+        print(f"{'endpoint':60} {'calls':>6} {'errors':>6} {'retries':>7} {'total s':>8} {'avg ms':>8} {'max ms':>8} "
+              f"{'KB sent':>8} {'KB recv':>8}")
+        for row in self.summary(top):
+            print(f"{row['endpoint'][:60]:60} {row['calls']:>6} {row['errors']:>6} {row['retries']:>7} "
+                  f"{row['total_ms'] / 1000:>8.2f} {row['avg_ms']:>8.1f} {row['max_ms']:>8.1f} "
+                  f"{row['bytes_sent'] / 1024:>8.1f} {row['bytes_received'] / 1024:>8.1f}")
+
+    def write_trace(self, path: str) -> None:
+        with self._lock:
+            calls = list(self.calls)
+        with open(path, "w") as f:
+            json.dump({"totals": self.totals(), "endpoints": self.summary(), "calls": calls}, f, indent=2)
+        print(f"API trace written to {path}.")
+
+
+class TracedSession(requests.Session):
+    """
+    requests.Session recording every request in an ApiTracer, and rate limiting them with a RateLimiter. Requests
+    throttled by the tenant (429) are held off across threads and sent again, up to THROTTLED_RETRIES times.
+
+    Requests accept two more keyword arguments: `endpoint`, the path to record the call under, for paths holding an
+    identifier, and `attempt`, for the callers' own retries.
+    """
+
+    def __init__(self, tracer: ApiTracer, limiter: RateLimiter):
+        super().__init__()
+        self.tracer = tracer
+        self.limiter = limiter
+
+    def request(self, method, url, *args, endpoint: Optional[str] = None, attempt: int = 1, **kwargs):
+        endpoint = endpoint or urlsplit(url).path
+        wait = self.limiter.acquire(url)
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            self.tracer.record(method, endpoint, None, started, attempt=attempt, error=e, wait_ms=wait * 1000)
+            raise
+        self._record(response, endpoint, started, attempt, wait)
+
+        for throttled in range(THROTTLED_RETRIES):
+            # Only bodies held in memory can be sent again, file uploads included as requests encodes them up front
+            if response.status_code != 429 or not isinstance(response.request.body, (str, bytes, type(None))):
+                break
+            self.limiter.throttled(url, retry_after(response, default=2 ** throttled))
+            attempt += 1
+            prepared = response.request.copy()
+            wait = self.limiter.acquire(url)
+            started = time.perf_counter()
+            try:
+                response = self.send(prepared, timeout=kwargs.get("timeout"),
+                                     **self.merge_environment_settings(prepared.url, kwargs.get("proxies") or {},
+                                                                       kwargs.get("stream"), kwargs.get("verify"),
+                                                                       kwargs.get("cert")))
+            except requests.RequestException as e:
+                self.tracer.record(method, endpoint, None, started, attempt=attempt, error=e, wait_ms=wait * 1000)
+                raise
+            self._record(response, endpoint, started, attempt, wait)
+        return response
+
+    def _record(self, response: requests.Response, endpoint: str, started: float, attempt: int, wait: float) -> None:
+        # The body as sent, JSON and multipart bodies alike. Streamed bodies have no length and aren't counted.
+        body = response.request.body
+        bytes_sent = len(body) if isinstance(body, (str, bytes)) else 0
+        error = None if response.ok else f"{response.status_code}: {response.text}"
+        self.tracer.record(response.request.method, endpoint, response.status_code, started, bytes_sent,
+                           len(response.content), attempt, error, wait * 1000)
+
+
+def retry_after(response: requests.Response, default: float) -> float:
+    """The seconds to wait before retrying a throttled request, from its Retry-After header when set in seconds"""
+    try:
+        return max(float(response.headers.get("Retry-After", "")), 0.0)
+    except ValueError:
+        return default
+
+
+TRACER = ApiTracer()
+SESSION = TracedSession(TRACER, LIMITER)
+
+
+def report() -> None:
+    """
+    Prints the summary of the run's API calls, listing the API_TRACE_TOP (default: 10) endpoints with the most total
+    time, and writes every call to the API_TRACE_FILE JSON file when set. Both are read from the environment, .env
+    included, when the run ends.
+    """
+    TRACER.print_summary(int(os.getenv("API_TRACE_TOP", "10")))
+    trace_file = os.getenv("API_TRACE_FILE", "")
+    if trace_file:
+        TRACER.write_trace(trace_file)
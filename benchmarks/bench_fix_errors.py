@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+bench_fix_errors.py
+-------------------
+
+Benchmarks fix_errors.py's fast textual path against the full YAML parser
+(ruamel round-trip, or PyYAML) on the repo's pack YAML files.
+
+Every file is copied to a temp dir and fixed with a [BA106] minimum version
+above its current one, once per mode, so both modes do a real update and
+write. Each result is checked against the original document with only
+`fromversion` changed ("ok" columns); a full-parser round-trip can alter
+other values of the document.
+
+Usage:
+    python3 benchmarks/bench_fix_errors.py
+    python3 benchmarks/bench_fix_errors.py --packs Packs --min-version 8.9.0 --repeat 3
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fix_errors  # noqa: E402
+
+
+def run_mode(files, workdir, min_version, fast, repeat):
+    """Fixes a fresh copy of every file `repeat` times, returns ({file: best seconds}, {file: fixed copy})."""
+    timings = {}
+    outputs = {}
+    for src in files:
+        dst = os.path.join(workdir, ('fast_' if fast else 'full_') + os.path.basename(src))
+        best = None
+        for _ in range(repeat):
+            shutil.copyfile(src, dst)
+            start = time.perf_counter()
+            fix_errors.fix_file(dst, {'BA106': min_version}, dry_run=False, fast=fast)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[src] = best
+        outputs[src] = dst
+    return timings, outputs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark fix_errors.py fast path vs full parser.")
+    ap.add_argument("--packs", default=os.path.join(os.path.dirname(__file__), '..', 'Packs'),
+                    help="Directory searched for *.yml files (default: Packs)")
+    ap.add_argument("--min-version", default="99.0.0", help="[BA106] minimum version applied (default: 99.0.0)")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per file and mode, best is kept (default: 3)")
+    args = ap.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.packs, '**', '*.yml'), recursive=True))
+    if not files:
+        sys.exit(f"No YAML files under {args.packs}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fast, fast_out = run_mode(files, workdir, args.min_version, True, args.repeat)
+        full, full_out = run_mode(files, workdir, args.min_version, False, args.repeat)
+
+        print(f"{'file':60} {'lines':>6} {'fast ms':>9} {'full ms':>9} {'speedup':>8} {'path':>6} {'fast ok':>8} "
+              f"{'full ok':>8}")
+        for src in files:
+            with open(src, 'r', encoding='utf-8') as f:
+                text = f.read()
+            expected = fix_errors.load_yaml(src)[0]
+            expected.pop('fromVersion', None)
+            expected['fromversion'] = args.min_version
+            fast_ok = fix_errors.load_yaml(fast_out[src])[0] == expected
+            full_ok = fix_errors.load_yaml(full_out[src])[0] == expected
+            path = 'fast' if fix_errors.is_plain_top_level_mapping(text) else 'full'
+            speedup = full[src] / fast[src] if fast[src] else float('inf')
+            print(f"{os.path.relpath(src, args.packs)[:60]:60} {text.count(chr(10)):>6} {fast[src] * 1000:>9.2f} "
+                  f"{full[src] * 1000:>9.2f} {speedup:>7.1f}x {path:>6} {'yes' if fast_ok else 'NO':>8} "
+                  f"{'yes' if full_ok else 'NO':>8}")
+
+        total_fast, total_full = sum(fast.values()), sum(full.values())
+        print(f"\nFiles: {len(files)}. Total fast: {total_fast * 1000:.1f} ms. Total full: {total_full * 1000:.1f} ms. "
+              f"Speedup: {total_full / total_fast if total_fast else float('inf'):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
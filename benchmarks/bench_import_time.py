@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+bench_import_time.py
+--------------------
+
+Measures the cold-start import cost of the repo's entry points (setup.py,
+capture.py) with `python -X importtime`, so regressions such as a heavy
+module-level import are caught before users pay for them.
+
+Each entry point is imported in a fresh interpreter `--repeat` times and the
+best total is kept. The heaviest top-level imports are listed, and the run
+fails if an entry point imports a forbidden module at load time (demisto_sdk
+by default) or goes over `--max-ms`.
+
+Usage:
+    python3 benchmarks/bench_import_time.py
+    python3 benchmarks/bench_import_time.py --modules setup capture --repeat 5 --max-ms 800 --top 10
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def import_profile(module):
+    """Imports `module` in a fresh interpreter, returns [(cumulative us, depth, name)] of its imports."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_ROOT, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+            imports.append((cumulative, (len(indent) - 1) // 2, name))
+    return imports
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the import time of the repo's entry points.")
+    ap.add_argument("--modules", nargs='+', default=['setup', 'capture'],
+                    help="Entry point modules imported from the repo root (default: setup capture)")
+    ap.add_argument("--repeat", type=int, default=3, help="Imports per module, best is kept (default: 3)")
+    ap.add_argument("--top", type=int, default=5, help="Heaviest top-level imports listed per module (default: 5)")
+    ap.add_argument("--forbid", nargs='*', default=['demisto_sdk'],
+                    help="Modules that must not be imported at load time (default: demisto_sdk)")
+    ap.add_argument("--max-ms", type=float, default=None, help="Fail if a module takes longer to import")
+    args = ap.parse_args()
+
+    failures = []
+    for module in args.modules:
+        best = None
+        for _ in range(args.repeat):
+            imports = import_profile(module)
+            total = next((cumulative for cumulative, depth, name in imports if name == module and depth == 0), 0)
+            if best is None or total < best[0]:
+                best = (total, imports)
+        total, imports = best
+
+        top_level = sorted(((cumulative, name) for cumulative, depth, name in imports if depth == 1), reverse=True)
+        print(f"{module}: {total / 1000:.1f} ms")
+        for cumulative, name in top_level[:args.top]:
+            print(f"    {name:40} {cumulative / 1000:>9.1f} ms")
+
+        loaded = {name.split('.')[0] for cumulative, depth, name in imports}
+        for forbidden in args.forbid:
+            if forbidden in loaded:
+                failures.append(f"{module} imports {forbidden} at load time")
+        if args.max_ms is not None and total / 1000 > args.max_ms:
+            failures.append(f"{module} takes {total / 1000:.1f} ms to import, over the {args.max_ms:.1f} ms budget")
+
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
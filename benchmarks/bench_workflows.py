@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+bench_workflows.py
+------------------
+
+End-to-end benchmarks of the repo's flows against benchmarks/mock_xsiam.py,
+so performance regressions are caught offline, without a tenant.
+
+The mock runs in its own process and is reseeded before every workflow. For
+each workflow the suite records the wall time, the number of requests the
+mock received (and how many it throttled with 429), the bytes exchanged and
+the peak memory allocated by the workflow (tracemalloc).
+
+The pack script workflows run in two command modes: "parallel", where the
+shim answers the executeCommand calls of the script's threads concurrently,
+and "serial", where they run one at a time behind a lock, as an engine runs
+them. The serial numbers are the closer to a tenant; the gap between both
+shows how much a script's concurrency relies on parallel executeCommand.
+
+Workflows:
+    setup            setup.py: credentials check, integration instances, pack zip upload
+    capture          capture.py: download of rules, dashboards, lookups, instances, jobs, packs
+    remove           removeFramework.py: removal of the SOC framework and config content
+    instances        IntegrationInstanceCreator for --items instances, half already on the tenant
+    correlations     CorrelationRuleCreator for --items rules, half already on the tenant
+    jobs             POVJobCreator for --items jobs, half already on the tenant, some of them unchanged
+    dashboards       DashboardCreator for --items dashboards sharing widgets
+    lookups          LookupDatasetCreator: diff sync of an existing dataset and a new dataset
+    shared_limits    POV XSIAM Content Management's test-module and LookupDatasetCreator drawing down the same
+                     tenant-wide xql bucket of the integration, through pov-rate-limit-acquire; fails otherwise
+
+Usage:
+    python3 benchmarks/bench_workflows.py
+    python3 benchmarks/bench_workflows.py --workflows jobs correlations --items 200 --latency-ms 20
+    python3 benchmarks/bench_workflows.py --rate-limit 50 --json bench_workflows.json
+    python3 benchmarks/bench_workflows.py --command-modes serial
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, 'Packs', 'POVContentPack', 'Scripts')
+INTEGRATION = os.path.join(REPO_ROOT, 'Packs', 'POVContentPack', 'Integrations', 'POV_XSIAM_Content_Management.yml')
+
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import xsoar_shim  # noqa: E402
+
+COMMAND_MODES = ['parallel', 'serial']
+
+
+@contextlib.contextmanager
+def mock_tenant(options):
+    """Starts mock_xsiam.py in its own process, so its allocations don't count, and yields its base URL."""
+    command = [sys.executable, os.path.join(BENCH_DIR, 'mock_xsiam.py'), '--port', '0',
+               '--latency-ms', str(options.latency_ms), '--rate-limit', str(options.rate_limit),
+               '--instances', str(options.tenant_size), '--jobs', str(options.tenant_size),
+               '--rules', str(options.tenant_size), '--dashboards', str(options.tenant_size),
+               '--lookup-rows', str(options.lookup_rows)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        line = process.stdout.readline()
+        if not line.startswith('Listening on '):
+            sys.exit(f"The mock tenant failed to start: {line}")
+        yield line.split()[-1]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def import_local_tools(base_url):
+    """Imports setup.py, capture.py and removeFramework.py pointed at the mock tenant."""
+    os.environ.update({"DEMISTO_BASE_URL": base_url, "XSIAM_AUTH_ID": "1", "DEMISTO_API_KEY": "benchmark",
+                       "CONTENT_REPO_RAW_LINK": ""})
+    import capture
+    import removeFramework
+    import setup
+    return setup, capture, removeFramework
+
+
+def script(name):
+    return os.path.join(SCRIPTS_DIR, f"{name}.yml")
+
+
+def half_seeded(prefix, options):
+    """--items names, the first half of them seeded on the mock and the second half missing from it."""
+    first = max(options.tenant_size - options.items // 2, 0)
+    return [f"{prefix}_{i}" for i in range(first, first + options.items)]
+
+
+def check_script(result):
+    if result.error:
+        raise Exception(result.error)
+    return len(result.outputs)
+
+
+def run_script(name, base_url, options, **kwargs):
+    """xsoar_shim.run_script of a pack script, its executeCommand calls serialized in the "serial" command mode."""
+    return xsoar_shim.run_script(script(name), base_url, serialize_commands=options.command_mode == 'serial', **kwargs)
+
+
+def run_setup(base_url, tools, options, workdir):
+    setup = tools[0]
+    zip_path = os.path.join(workdir, 'POVContentPack.zip')
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        pack_path = os.path.join(REPO_ROOT, 'Packs', 'POVContentPack')
+        for root, _, files in os.walk(pack_path):
+            for name in files:
+                zf.write(os.path.join(root, name), os.path.relpath(os.path.join(root, name), pack_path))
+
+    setup.verify_credentials()
+    setup.create_integration_instances()
+    setup.upload_pack_zip(zip_path)
+    return 1
+
+
+def run_capture(base_url, tools, options, workdir):
+    capture = tools[1]
+    for directory in ('CorrelationRules', 'XSIAMDashboards', 'LookupData'):
+        os.makedirs(os.path.join(workdir, directory), exist_ok=True)
+    capture.download_content_from_api(workdir)
+    return (len(capture.download_lookup_datasets(workdir)) + len(capture.download_integration_instances(workdir)) +
+            len(capture.download_jobs(workdir)) + len(capture.download_marketplace_packs(workdir)))
+
+
+def run_remove(base_url, tools, options, workdir):
+    remove_framework = tools[2]
+    remove_framework.delete_soc_content()
+    remove_framework.delete_threat_intel()
+    remove_framework.delete_config_automation_content()
+    return 1
+
+
+def run_instances(base_url, tools, options, workdir):
+    names = half_seeded("instance", options)
+    definitions = [{"name": name, "brand": "Brand 0", "data": []} for name in names]
+    return check_script(run_script(
+        'IntegrationInstanceCreator', base_url, options, args={'integration_instance_name': names},
+        context={'ConfigurationSetup': {'IntegrationInstances': definitions}}))
+
+
+def run_correlations(base_url, tools, options, workdir):
+    names = half_seeded("rule", options)
+    definitions = [{"name": name, "severity": "SEV_030_MEDIUM", "xql_query": "dataset = xdr_data"} for name in names]
+    return check_script(run_script(
+        'CorrelationRuleCreator', base_url, options, args={'correlation_rule_name': names},
+        context={'ConfigurationSetup': {'CorrelationRules': definitions}}))
+
+
+def run_jobs(base_url, tools, options, workdir):
+    names = half_seeded("job", options)
+    # Of the seeded jobs, one in three is unchanged and the others change their schedule
+    definitions = [{"name": name, "cron": "0 * * * *" if i % 3 == 0 else "*/5 * * * *", "scheduled": True,
+                    "playbookId": "playbook_0"} for i, name in enumerate(names)]
+    return check_script(run_script(
+        'POVJobCreator', base_url, options, args={'job_name': names},
+        context={'ConfigurationSetup': {'Jobs': definitions}}))
+
+
+def run_dashboards(base_url, tools, options, workdir):
+    shared_widgets = [{"widget_key": f"shared_{i}", "title": f"Shared {i}"} for i in range(5)]
+    definitions = [{"name": f"entry_{i}", "data": {
+        "dashboards_data": [{"global_id": f"bench-{i}", "name": f"Bench {i}"}],
+        "widgets_data": shared_widgets + [{"widget_key": f"own_{i}", "title": f"Own {i}"}]}}
+        for i in range(options.items)]
+    return check_script(run_script(
+        'DashboardCreator', base_url, options, args={'dashboard_entry_name': [d['name'] for d in definitions]},
+        context={'ConfigurationSetup': {'Dashboards': definitions}}))
+
+
+def run_lookups(base_url, tools, options, workdir):
+    schema = {"id": "text", "value": "text"}
+    # Every tenth row changed, and the last rows replaced by new ones
+    existing_rows = [{"id": str(r), "value": f"value_{r}" if r % 10 else f"changed_{r}"}
+                     for r in range(options.lookup_rows - options.lookup_rows // 20)]
+    existing_rows += [{"id": f"new_{r}", "value": "new"} for r in range(options.lookup_rows // 20)]
+    new_rows = [{"id": str(r), "value": f"value_{r}"} for r in range(options.lookup_rows)]
+    definitions = [
+        {"dataset_name": "lookup_0", "dataset_type": "lookup", "dataset_schema": schema, "key_fields": ["id"],
+         "data": existing_rows},
+        {"dataset_name": "bench_new", "dataset_type": "lookup", "dataset_schema": schema, "data": new_rows},
+    ]
+    count = 0
+    for definition in definitions:
+        count += check_script(run_script(
+            'LookupDatasetCreator', base_url, options, args={'lookup_dataset_name': definition['dataset_name']},
+            context={'ConfigurationSetup': {'LookupDatasets': definitions}}))
+    return count
+
+
+def run_shared_limits(base_url, tools, options, workdir):
+    # A negligible refill over a large burst, so the bucket's tokens count the calls drawn from it
+    burst = 1000000
+    integration = xsoar_shim.Integration(INTEGRATION, base_url, params={
+        "url": base_url, "credentials": {"identifier": os.environ["XSIAM_AUTH_ID"],
+                                         "password": os.environ["DEMISTO_API_KEY"]},
+        "rate_limits": f"xql=0.000001:{burst}"})
+    result = integration.run('test-module')
+    if result.error:
+        raise Exception(result.error)
+
+    schema = {"id": "text", "value": "text"}
+    definitions = [{"dataset_name": "bench_shared", "dataset_type": "lookup", "dataset_schema": schema,
+                    "data": [{"id": str(r), "value": f"value_{r}"} for r in range(options.lookup_rows)]}]
+    check_script(run_script(
+        'LookupDatasetCreator', base_url, options, args={'lookup_dataset_name': 'bench_shared'},
+        context={'ConfigurationSetup': {'LookupDatasets': definitions}},
+        commands=integration.commands(['pov-rate-limit-acquire'])))
+
+    # Every call of both executions is an xql call, and the unused tokens were given back at their end
+    calls = requests.get(f"{base_url}/__mock__/stats").json()['totals']['requests']
+    buckets = integration.context.get().get('rate_limits', {})
+    expected_key = f"{base_url.split('://', 1)[-1].rstrip('/')}|xql"
+    if list(buckets) != [expected_key]:
+        raise Exception(f"Expected a single {expected_key} bucket, got {list(buckets)}")
+    drawn = round(burst - buckets[expected_key]['tokens'])
+    if drawn != calls:
+        raise Exception(f"The shared bucket was drawn down by {drawn} tokens for {calls} calls")
+    return drawn
+
+
+WORKFLOWS = {
+    'setup': run_setup,
+    'capture': run_capture,
+    'remove': run_remove,
+    'instances': run_instances,
+    'correlations': run_correlations,
+    'jobs': run_jobs,
+    'dashboards': run_dashboards,
+    'lookups': run_lookups,
+    'shared_limits': run_shared_limits,
+}
+# Workflows of the pack scripts, run in each command mode; the others are local tools, run once
+SCRIPT_WORKFLOWS = {'instances', 'correlations', 'jobs', 'dashboards', 'lookups', 'shared_limits'}
+
+
+def run_workflow(name, base_url, tools, options, command_mode='-'):
+    """Runs a workflow against a freshly seeded mock, returns its measurements."""
+    requests.post(f"{base_url}/__mock__/reset")
+    workflow_options = argparse.Namespace(**vars(options), command_mode=command_mode)
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        start = time.perf_counter()
+        error = None
+        try:
+            items = WORKFLOWS[name](base_url, tools, workflow_options, workdir)
+        except Exception as e:
+            items, error = 0, str(e)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    totals = requests.get(f"{base_url}/__mock__/stats").json()['totals']
+    return {"workflow": name, "command_mode": command_mode, "wall_ms": round(elapsed * 1000, 1), "requests": totals['requests'],
+            "throttled": totals['throttled'], "kb_sent": round(totals['bytes_in'] / 1024, 1),
+            "kb_received": round(totals['bytes_out'] / 1024, 1), "peak_kb": round(peak / 1024, 1),
+            "items": items, "error": error}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the repo's flows against a local mock XSIAM tenant.")
+    ap.add_argument("--workflows", nargs='+', choices=list(WORKFLOWS), default=list(WORKFLOWS),
+                    help="Workflows to run (default: all)")
+    ap.add_argument("--items", type=int, default=50, help="Objects configured by the pack script workflows (default: 50)")
+    ap.add_argument("--tenant-size", type=int, default=100,
+                    help="Instances, jobs, rules and dashboards seeded on the mock (default: 100)")
+    ap.add_argument("--lookup-rows", type=int, default=5000, help="Rows per seeded lookup dataset (default: 5000)")
+    ap.add_argument("--latency-ms", type=float, default=5, help="Latency of each mock request (default: 5)")
+    ap.add_argument("--rate-limit", type=float, default=0, help="Mock requests per second before 429s (default: off)")
+    ap.add_argument("--command-modes", nargs='+', choices=COMMAND_MODES, default=COMMAND_MODES,
+                    help="How the shim runs the pack scripts' executeCommand calls: concurrently (parallel) or one at "
+                         "a time like an engine (serial). Default: both")
+    ap.add_argument("--json", help="Also write the results to this JSON file")
+    options = ap.parse_args()
+
+    with mock_tenant(options) as base_url:
+        tools = import_local_tools(base_url)
+        results = []
+        for name in options.workflows:
+            command_modes = options.command_modes if name in SCRIPT_WORKFLOWS else ['-']
+            if len(command_modes) > 1:
+                # Untimed run first, so the first mode doesn't pay the script's imports alone
+                run_workflow(name, base_url, tools, options, command_modes[0])
+            for command_mode in command_modes:
+                results.append(run_workflow(name, base_url, tools, options, command_mode))
+
+    print(f"{'workflow':14} {'mode':8} {'wall ms':>10} {'requests':>9} {'429s':>6} {'KB sent':>9} {'KB recv':>9} "
+          f"{'peak KB':>9} {'items':>6}")
+    for r in results:
+        print(f"{r['workflow']:14} {r['command_mode']:8} {r['wall_ms']:>10.1f} {r['requests']:>9} {r['throttled']:>6} {r['kb_sent']:>9.1f} "
+              f"{r['kb_received']:>9.1f} {r['peak_kb']:>9.1f} {r['items']:>6}"
+              + (f"  ERROR: {r['error'][:80]}" if r['error'] else ''))
+
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump({"options": vars(options), "results": results}, f, indent=2)
+
+    if any(r['error'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+mock_xsiam.py
+-------------
+
+A local stand-in for an XSIAM tenant, so the repo's flows (setup.py,
+capture.py, removeFramework.py and the pack scripts through `core-api-*`)
+can be run and measured without a live tenant.
+
+It implements, in memory, the endpoints those flows call: credentials,
+integration instances, jobs, correlation rules, dashboards/widgets, lookup
+datasets, lists, content packs, playbooks/scripts, incident fields and
+alerts. Paths are accepted with or without the `/xsoar` and `/public/v1`
+prefixes, as the tenant does for the Core REST API.
+
+The tenant is seeded with `--instances`, `--jobs`, `--rules`,
+`--dashboards`, `--datasets` x `--lookup-rows` objects. Every request waits
+`--latency-ms` (+ up to `--jitter-ms`), and requests beyond `--rate-limit`
+per second (token bucket of `--burst`) are answered with 429.
+
+Control endpoints:
+    GET  /__mock__/stats   request count, 429s and bytes, per endpoint
+    POST /__mock__/reset   reseed the tenant and clear the stats
+
+Usage:
+    python3 benchmarks/mock_xsiam.py --port 8080
+    python3 benchmarks/mock_xsiam.py --port 0 --latency-ms 50 --rate-limit 20 --jobs 500
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+CREDENTIAL_NAME = "Standard XSIAM API Key"
+
+
+class TokenBucket:
+    """Allows `rate` requests per second, with bursts of up to `burst` requests."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def normalize_path(path):
+    """Strips the /xsoar and /public/v1 prefixes, so /xsoar/public/v1/jobs/search and /jobs/search match."""
+    path = '/' + path.lstrip('/')
+    for prefix in ('/xsoar', '/public/v1'):
+        if path == prefix or path.startswith(prefix + '/'):
+            path = path[len(prefix):] or '/'
+    return path
+
+
+def name_filter(request_data):
+    """Returns a predicate for the EQ/IN name filters of the public API `filters` lists."""
+    conditions = []
+    for f in (request_data or {}).get('filters') or []:
+        values = f.get('value') if isinstance(f.get('value'), list) else [f.get('value')]
+        conditions.append((f.get('field'), set(str(v) for v in values)))
+    return lambda obj: all(str(obj.get(field)) in values for field, values in conditions)
+
+
+class Tenant:
+    """The tenant's objects, seeded with the configured sizes."""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        sizes = self.sizes
+        with self._lock:
+            self.ids = iter(range(1_000_000, sys.maxsize))
+            self.instances = {f"instance_{i}": {"id": f"inst-{i}", "name": f"instance_{i}", "brand": f"Brand {i % 10}",
+                                                "enabled": "true", "data": [], "version": 1}
+                              for i in range(sizes['instances'])}
+            self.jobs = {f"job_{i}": {"id": f"job-{i}", "name": f"job_{i}", "cron": "0 * * * *", "scheduled": True,
+                                      "playbookId": "playbook_0", "version": 1}
+                         for i in range(sizes['jobs'])}
+            self.rules = {f"rule_{i}": {"rule_id": i, "name": f"rule_{i}", "severity": "SEV_020_LOW",
+                                        "xql_query": f"dataset = xdr_data | filter event_id = {i}", "is_enabled": True}
+                          for i in range(sizes['rules'])}
+            self.dashboards = {f"dashboard_{i}": {"dashboards_data": [{"global_id": f"dash-{i}", "name": f"dashboard_{i}"}],
+                                                  "widgets_data": [{"widget_key": f"widget_{i}", "title": f"widget_{i}"}]}
+                               for i in range(sizes['dashboards'])}
+            self.datasets = {f"lookup_{d}": [{"id": str(r), "value": f"value_{r}"} for r in range(sizes['lookup_rows'])]
+                             for d in range(sizes['datasets'])}
+            self.lists = {f"list_{i}": {"id": f"list_{i}", "name": f"list_{i}", "data": ""} for i in range(10)}
+            self.packs = {f"Pack{i}": {"id": f"Pack{i}", "name": f"Pack {i}", "currentVersion": "1.0.0"}
+                          for i in range(sizes['packs'])}
+            self.playbooks = {f"playbook_{i}": {"id": f"playbook_{i}", "name": f"playbook_{i}"} for i in range(10)}
+            self.scripts = {f"script_{i}": {"id": f"script_{i}", "name": f"script_{i}"} for i in range(10)}
+            self.fields = {f"incident_field_{i}": {"id": f"incident_field_{i}"} for i in range(10)}
+            self.alerts = {}
+            self.uploads = 0
+
+    def next_id(self):
+        return str(next(self.ids))
+
+    # Each handler takes (body, path match) and returns (status, response body)
+
+    def credentials(self, body, match):
+        return 200, {"credentials": [{"id": CREDENTIAL_NAME, "name": CREDENTIAL_NAME}]}
+
+    def search_instances(self, body, match):
+        with self._lock:
+            return 200, {"instances": list(self.instances.values()), "total": len(self.instances)}
+
+    def test_instance(self, body, match):
+        return 200, {"success": True, "message": ""}
+
+    def put_instance(self, body, match):
+        with self._lock:
+            instance = dict(self.instances.get(body.get('name')) or {"id": self.next_id()}, **body)
+            instance.setdefault('enabled', 'true')
+            self.instances[instance['name']] = instance
+            return 200, instance
+
+    def delete_instance(self, body, match):
+        with self._lock:
+            self.instances = {k: v for k, v in self.instances.items() if v.get('id') != match.group(1)}
+        return 200, {}
+
+    def integration_commands(self, body, match):
+        return 200, [{"id": "POV XSIAM Content Management", "name": "POV XSIAM Content Management"}]
+
+    def search_jobs(self, body, match):
+        query = (body or {}).get('query') or ''
+        name = re.match(r'^name:"?(.*?)"?$', query)
+        with self._lock:
+            jobs = [j for j in self.jobs.values() if not name or j['name'] == name.group(1)]
+        page, size = int(body.get('page') or 0), int(body.get('size') or 50)
+        return 200, {"total": len(jobs), "data": jobs[page * size:(page + 1) * size]}
+
+    def post_job(self, body, match):
+        with self._lock:
+            job = dict(self.jobs.get(body.get('name')) or {"id": self.next_id()}, **body)
+            job['version'] = job.get('version', 0) + 1
+            self.jobs[job['name']] = job
+            return 200, job
+
+    def delete_job(self, body, match):
+        with self._lock:
+            self.jobs = {k: v for k, v in self.jobs.items() if v.get('id') != match.group(1)}
+        return 200, {}
+
+    def get_rules(self, body, match):
+        matches = name_filter((body or {}).get('request_data'))
+        with self._lock:
+            rules = [r for r in self.rules.values() if matches(r)]
+        return 200, {"objects_count": len(rules), "objects": rules}
+
+    def insert_rules(self, body, match):
+        added, updated = [], []
+        with self._lock:
+            for rule in (body or {}).get('request_data') or []:
+                existing = rule.get('name') in self.rules
+                self.rules[rule.get('name')] = dict(self.rules.get(rule.get('name')) or {"rule_id": self.next_id()}, **rule)
+                (updated if existing else added).append(self.rules[rule.get('name')]['rule_id'])
+        return 200, {"added_objects": added, "updated_objects": updated, "errors": []}
+
+    def delete_rules(self, body, match):
+        matches = name_filter((body or {}).get('request_data'))
+        with self._lock:
+            self.rules = {k: v for k, v in self.rules.items() if not matches(v)}
+        return 200, {"objects_count": 0}
+
+    def get_dashboards(self, body, match):
+        with self._lock:
+            return 200, {"objects_count": len(self.dashboards), "objects": list(self.dashboards.values())}
+
+    def insert_dashboards(self, body, match):
+        with self._lock:
+            for obj in (body or {}).get('request_data') or []:
+                for dashboard in obj.get('dashboards_data') or []:
+                    self.dashboards[dashboard.get('name')] = {"dashboards_data": [dashboard],
+                                                              "widgets_data": obj.get('widgets_data') or []}
+        return 200, {"errors": []}
+
+    def delete_dashboards(self, body, match):
+        matches = name_filter((body or {}).get('request_data'))
+        with self._lock:
+            self.dashboards = {k: v for k, v in self.dashboards.items() if not matches({"name": k})}
+        return 200, {}
+
+    def ok(self, body, match):
+        return 200, {}
+
+    def get_datasets(self, body, match):
+        with self._lock:
+            return 200, {"reply": [{"Dataset Name": name, "Type": "LOOKUP", "Total Size Stored": len(rows)}
+                                   for name, rows in self.datasets.items()]}
+
+    def add_dataset(self, body, match):
+        request_data = (body or {}).get('request_data') or {}
+        with self._lock:
+            if request_data.get('dataset_name') in self.datasets:
+                return 409, {"reply": {"err_msg": "Dataset already exists"}}
+            self.datasets[request_data.get('dataset_name')] = []
+        return 200, {"reply": {"dataset_name": request_data.get('dataset_name')}}
+
+    def delete_dataset(self, body, match):
+        with self._lock:
+            self.datasets.pop(((body or {}).get('request_data') or {}).get('dataset_name'), None)
+        return 200, {"reply": True}
+
+    def lookup_get_data(self, body, match):
+        request_data = (body or {}).get('request_data') or (body or {}).get('request') or {}
+        with self._lock:
+            rows = list(self.datasets.get(request_data.get('dataset_name'), []))
+        limit = int(request_data.get('limit') or 0) or len(rows)
+        return 200, {"reply": {"data": rows[:limit], "total_count": len(rows), "filtered_count": len(rows)}}
+
+    def lookup_add_data(self, body, match):
+        request_data = (body or {}).get('request_data') or {}
+        key_fields = request_data.get('key_fields') or []
+        with self._lock:
+            rows = self.datasets.setdefault(request_data.get('dataset_name'), [])
+            if key_fields:
+                keys = {tuple(row.get(f) for f in key_fields) for row in request_data.get('data') or []}
+                rows[:] = [row for row in rows if tuple(row.get(f) for f in key_fields) not in keys]
+            rows.extend(request_data.get('data') or [])
+        return 200, {"reply": {"added": len(request_data.get('data') or []), "updated": 0, "skipped": 0}}
+
+    def lookup_remove_data(self, body, match):
+        request_data = (body or {}).get('request_data') or {}
+        filters = request_data.get('filters') or []
+        with self._lock:
+            rows = self.datasets.get(request_data.get('dataset_name'), [])
+            kept = [row for row in rows if not any(all(row.get(k) == v for k, v in f.items()) for f in filters)]
+            self.datasets[request_data.get('dataset_name')] = kept
+        return 200, {"reply": {"deleted": len(rows) - len(kept)}}
+
+    def installed_packs(self, body, match):
+        with self._lock:
+            return 200, list(self.packs.values())
+
+    def upload_pack(self, body, match):
+        with self._lock:
+            self.uploads += 1
+        return 200, {}
+
+    def install_packs(self, body, match):
+        with self._lock:
+            for pack in (body or {}).get('packs') or []:
+                self.packs[pack.get('id')] = {"id": pack.get('id'), "name": pack.get('id'),
+                                              "currentVersion": pack.get('version')}
+        return 200, {"packs": (body or {}).get('packs') or []}
+
+    def pack_dependencies(self, body, match):
+        return 200, {"packs": [], "dependencies": {}}
+
+    def marketplace_pack(self, body, match):
+        return 200, {"id": match.group(1), "currentVersion": "1.0.0", "versions": ["1.0.0"]}
+
+    def get_lists(self, body, match):
+        with self._lock:
+            return 200, list(self.lists.values())
+
+    def save_list(self, body, match):
+        with self._lock:
+            self.lists[body.get('name') or body.get('id')] = dict(body, id=body.get('name') or body.get('id'))
+        return 200, body
+
+    def download_list(self, body, match):
+        with self._lock:
+            if match.group(1) not in self.lists:
+                return 404, {"error": f"List {match.group(1)} not found"}
+            return 200, self.lists[match.group(1)].get('data') or ''
+
+    def delete_list(self, body, match):
+        with self._lock:
+            self.lists.pop((body or {}).get('id'), None)
+        return 200, {}
+
+    def search_scripts(self, body, match):
+        name = ((body or {}).get('query') or '').replace('name:', '')
+        with self._lock:
+            return 200, {"scripts": [s for s in self.scripts.values() if s['name'] == name]}
+
+    def delete_script(self, body, match):
+        with self._lock:
+            self.scripts.pop(((body or {}).get('script') or {}).get('id'), None)
+        return 200, {}
+
+    def search_playbooks(self, body, match):
+        with self._lock:
+            return 200, {"playbooks": [p for p in self.playbooks.values() if p['name'] == (body or {}).get('query')]}
+
+    def delete_playbook(self, body, match):
+        playbook_id = (((body or {}).get('request_data') or {}).get('filter') or {}).get('value')
+        with self._lock:
+            self.playbooks.pop(playbook_id, None)
+        return 200, {}
+
+    def get_layouts(self, body, match):
+        return 200, []
+
+    def get_fields(self, body, match):
+        with self._lock:
+            return 200, list(self.fields.values())
+
+    def delete_field(self, body, match):
+        with self._lock:
+            self.fields.pop(match.group(1), None)
+        return 200, {}
+
+    def create_alert(self, body, match):
+        external_id = self.next_id()
+        with self._lock:
+            self.alerts[external_id] = {"external_id": external_id, "alert_id": self.next_id()}
+        return 200, {"reply": external_id}
+
+    def get_alerts(self, body, match):
+        matches = name_filter(((body or {}).get('request_data') or {}))
+        with self._lock:
+            alerts = [a for a in self.alerts.values() if matches({"external_id_list": a['external_id']})]
+        return 200, {"reply": {"total_count": len(alerts), "alerts": alerts}}
+
+
+ROUTES = [
+    ('POST', r'/settings/credentials', 'credentials'),
+    ('POST', r'/settings/integration/search', 'search_instances'),
+    ('POST', r'/settings/integration/test', 'test_instance'),
+    ('PUT', r'/settings/integration', 'put_instance'),
+    ('DELETE', r'/settings/integration/([^/]+)', 'delete_instance'),
+    ('GET', r'/settings/integration-commands', 'integration_commands'),
+    ('POST', r'/settings/integration-conf/delete', 'ok'),
+    ('POST', r'/jobs/search', 'search_jobs'),
+    ('POST', r'/jobs', 'post_job'),
+    ('DELETE', r'/jobs/([^/]+)', 'delete_job'),
+    ('POST', r'/public_api/v1/correlations/get', 'get_rules'),
+    ('POST', r'/public_api/v1/correlations/insert', 'insert_rules'),
+    ('POST', r'/public_api/v1/correlations/delete', 'delete_rules'),
+    ('POST', r'/public_api/v1/dashboards/get', 'get_dashboards'),
+    ('POST', r'/public_api/v1/dashboards/insert', 'insert_dashboards'),
+    ('POST', r'/public_api/v1/dashboards/delete', 'delete_dashboards'),
+    ('POST', r'/public_api/v1/widgets/delete', 'ok'),
+    ('POST', r'/public_api/v1/xql/get_datasets', 'get_datasets'),
+    ('POST', r'/public_api/v1/xql/add_dataset', 'add_dataset'),
+    ('POST', r'/public_api/v2/xql/delete_dataset', 'delete_dataset'),
+    ('POST', r'/public_api/v1/xql/lookups/get_data', 'lookup_get_data'),
+    ('POST', r'/public_api/v1/xql/lookups/add_data', 'lookup_add_data'),
+    ('POST', r'/public_api/v1/xql/lookups/remove_data', 'lookup_remove_data'),
+    ('GET', r'/contentpacks/metadata/installed', 'installed_packs'),
+    ('POST', r'/contentpacks/installed/upload', 'upload_pack'),
+    ('POST', r'/contentpacks/marketplace/install', 'install_packs'),
+    ('POST', r'/contentpacks/marketplace/search/dependencies', 'pack_dependencies'),
+    ('GET', r'/contentpacks/marketplace/([^/]+)', 'marketplace_pack'),
+    ('GET', r'/lists', 'get_lists'),
+    ('GET', r'/lists/download/([^/]+)', 'download_list'),
+    ('POST', r'/lists/save', 'save_list'),
+    ('POST', r'/lists/delete', 'delete_list'),
+    ('POST', r'/automation/search', 'search_scripts'),
+    ('POST', r'/automation/delete', 'delete_script'),
+    ('POST', r'/playbook/search', 'search_playbooks'),
+    ('POST', r'/public_api/v1/playbooks/delete', 'delete_playbook'),
+    ('GET', r'/layouts', 'get_layouts'),
+    ('POST', r'/layout/([^/]+)/remove', 'ok'),
+    ('GET', r'/incidentfields', 'get_fields'),
+    ('DELETE', r'/incidentfield/([^/]+)', 'delete_field'),
+    ('POST', r'/public_api/v1/alerts/create_alert', 'create_alert'),
+    ('POST', r'/public_api/v1/alerts/get_alerts', 'get_alerts'),
+]
+COMPILED_ROUTES = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES]
+
+
+class Stats:
+    """Request count, 429s and bytes per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = defaultdict(lambda: {"requests": 0, "throttled": 0, "bytes_in": 0, "bytes_out": 0})
+
+    def record(self, endpoint, throttled, bytes_in, bytes_out):
+        with self._lock:
+            entry = self.endpoints[endpoint]
+            entry['requests'] += 1
+            entry['throttled'] += int(throttled)
+            entry['bytes_in'] += bytes_in
+            entry['bytes_out'] += bytes_out
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {k: dict(v) for k, v in self.endpoints.items()}
+        totals = {key: sum(e[key] for e in endpoints.values())
+                  for key in ('requests', 'throttled', 'bytes_in', 'bytes_out')}
+        return {"totals": totals, "endpoints": endpoints}
+
+
+def make_handler(tenant, stats, options):
+    bucket = TokenBucket(options.rate_limit, options.burst or options.rate_limit) if options.rate_limit else None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately, which stalls kept-alive connections on delayed ACKs otherwise
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body):
+            # Strings are sent as is, like the list downloads
+            payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/plain' if isinstance(body, str) else 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            if status == 429:
+                self.send_header('Retry-After', '1')
+            self.end_headers()
+            self.wfile.write(payload)
+            return len(payload)
+
+        def _read_body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            if 'multipart/form-data' in (self.headers.get('Content-Type') or ''):
+                return raw, {}
+            try:
+                return raw, json.loads(raw) if raw else {}
+            except ValueError:
+                return raw, {}
+
+        def _handle(self):
+            path = urlparse(self.path).path
+            raw, body = self._read_body()
+
+            if path == '/__mock__/stats':
+                return self._send(200, stats.snapshot())
+            if path == '/__mock__/reset':
+                tenant.reset()
+                stats.reset()
+                return self._send(200, {})
+
+            endpoint = f"{self.command} {normalize_path(path)}"
+            if options.latency_ms or options.jitter_ms:
+                time.sleep((options.latency_ms + random.uniform(0, options.jitter_ms)) / 1000)
+
+            if bucket and not bucket.take():
+                stats.record(endpoint, True, len(raw), self._send(429, {"error": "Too many requests"}))
+                return
+
+            for method, pattern, handler in COMPILED_ROUTES:
+                match = pattern.match(normalize_path(path))
+                if method == self.command and match:
+                    status, response = getattr(tenant, handler)(body, match)
+                    break
+            else:
+                status, response = 404, {"error": f"{endpoint} is not implemented by the mock"}
+
+            stats.record(endpoint, False, len(raw), self._send(status, response))
+
+        do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    return Handler
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Local stand-in for an XSIAM tenant.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080, help="Port to listen on, 0 picks a free one (default: 8080)")
+    ap.add_argument("--latency-ms", type=float, default=0, help="Latency added to every request (default: 0)")
+    ap.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency, up to this value (default: 0)")
+    ap.add_argument("--rate-limit", type=float, default=0, help="Requests per second before 429s, 0 disables it")
+    ap.add_argument("--burst", type=int, default=0, help="Requests allowed in a burst (default: the rate limit)")
+    ap.add_argument("--instances", type=int, default=50, help="Integration instances seeded (default: 50)")
+    ap.add_argument("--jobs", type=int, default=50, help="Jobs seeded (default: 50)")
+    ap.add_argument("--rules", type=int, default=50, help="Correlation rules seeded (default: 50)")
+    ap.add_argument("--dashboards", type=int, default=10, help="Dashboards seeded (default: 10)")
+    ap.add_argument("--datasets", type=int, default=3, help="Lookup datasets seeded (default: 3)")
+    ap.add_argument("--lookup-rows", type=int, default=1000, help="Rows per lookup dataset (default: 1000)")
+    ap.add_argument("--packs", type=int, default=20, help="Installed content packs seeded (default: 20)")
+    return ap
+
+
+def serve(options, ready=None):
+    """Runs the mock until interrupted. `ready` is called with the base URL once it listens."""
+    sizes = {key: getattr(options, key) for key in ('instances', 'jobs', 'rules', 'dashboards', 'datasets',
+                                                    'lookup_rows', 'packs')}
+    server = ThreadingHTTPServer((options.host, options.port), make_handler(Tenant(sizes), Stats(), options))
+    server.daemon_threads = True
+    base_url = f"http://{options.host}:{server.server_port}"
+    if ready:
+        ready(base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    options = build_parser().parse_args()
+    serve(options, ready=lambda base_url: print(f"Listening on {base_url}", flush=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+xsoar_shim.py
+-------------
+
+Runs the pack's YAML scripts and integration locally, outside XSOAR/XSIAM,
+for the benchmarks. It provides the small part of CommonServerPython they
+use, and answers `core-api-get/post/put/delete` with HTTP requests to a
+tenant, normally benchmarks/mock_xsiam.py, the way the Core REST API
+integration does. Other commands are answered by the `commands` given to
+run_script, e.g. the integration's, with Integration.commands().
+
+The shim answers the executeCommand calls of a script's threads concurrently.
+An engine runs them one at a time, so serialize_commands=True puts them
+behind a lock, to measure the script as the engine runs it.
+
+    result = run_script('Packs/POVContentPack/Scripts/POVJobCreator.yml', base_url,
+                        args={'job_name': ['job_1']}, context={'ConfigurationSetup': {...}})
+    result.outputs, result.error
+
+    integration = Integration('Packs/POVContentPack/Integrations/POV_XSIAM_Content_Management.yml', base_url,
+                              params={...})
+    integration.run('test-module')
+    run_script(..., commands=integration.commands(['pov-rate-limit-acquire']))
+    integration.context.get()
+"""
+import json
+import os
+import threading
+import time
+import typing
+import uuid
+
+import requests
+import yaml
+
+ENTRY_NOTE = 1
+ENTRY_ERROR = 4
+
+
+class ScriptError(Exception):
+    """Raised by return_error to end the script, as sys.exit does in XSOAR."""
+
+
+class DemistoException(Exception):
+    def __init__(self, message, exception=None, res=None, *args):
+        super().__init__(message, exception, res, *args)
+        self.message = message
+        self.exception = exception
+        self.res = res
+
+    def __str__(self):
+        return str(self.message)
+
+
+class IntegrationContext:
+    """Integration context of an integration instance, versioned like the server's."""
+
+    def __init__(self, value=None):
+        self._value = value or {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        return self.get_with_version()[0]
+
+    def get_with_version(self):
+        with self._lock:
+            return json.loads(json.dumps(self._value)), self._version
+
+    def set(self, value, version=-1):
+        with self._lock:
+            if version != -1 and version != self._version:
+                raise ValueError(f"Version mismatch, the context is at version {self._version}, not {version}")
+            self._value = json.loads(json.dumps(value))
+            self._version += 1
+
+
+class Demisto:
+    """The `demisto` object of a single script or integration command execution."""
+
+    def __init__(self, base_url, args, context, headers=None, debug=False, commands=None, params=None, command=None,
+                 serialize_commands=False):
+        self.base_url = base_url.rstrip('/')
+        self._args = args
+        self._context = context
+        self._headers = headers or {}
+        self._debug = debug
+        self._commands = commands or {}
+        self._params = params or {}
+        self._command = command
+        self._command_lock = threading.Lock() if serialize_commands else None
+        self._session = requests.Session()
+        self.entries = []
+
+    def args(self):
+        return self._args
+
+    def params(self):
+        return self._params
+
+    def command(self):
+        return self._command
+
+    def context(self):
+        return self._context
+
+    def investigation(self):
+        return {"id": "benchmark"}
+
+    def uniqueFile(self):
+        return str(uuid.uuid4())
+
+    def getFilePath(self, entry_id):
+        files = self._context.get('File') or []
+        files = files if isinstance(files, list) else [files]
+        entry = next(x for x in files if x.get('EntryID') == entry_id)
+        return {"path": entry['Path'], "name": entry['Name']}
+
+    def debug(self, message):
+        if self._debug:
+            print(f"DEBUG {message}")
+
+    info = error = debug
+
+    def results(self, entry):
+        self.entries.append(entry)
+
+    def core_api_path(self, uri):
+        """Maps a core-api uri to a tenant path, adding /xsoar to the paths outside the public API."""
+        uri = '/' + uri.lstrip('/')
+        if uri.startswith('/public_api') or uri.startswith('/xsoar'):
+            return uri
+        return '/xsoar' + uri
+
+    def executeCommand(self, command, args):
+        if self._command_lock:
+            with self._command_lock:
+                return self._execute_command(command, args)
+        return self._execute_command(command, args)
+
+    def _execute_command(self, command, args):
+        if command in self._commands:
+            return self._commands[command](args)
+
+        methods = {'core-api-get': 'GET', 'core-api-post': 'POST', 'core-api-put': 'PUT', 'core-api-delete': 'DELETE'}
+        if command not in methods:
+            return [{"Type": ENTRY_ERROR, "Contents": f"{command} is not supported by the shim"}]
+
+        body = args.get('body')
+        if isinstance(body, str):
+            body = json.loads(body) if body else None
+        response = self._session.request(methods[command], self.base_url + self.core_api_path(args['uri']),
+                                         headers=self._headers, json=body)
+        if response.status_code not in (200, 201):
+            return [{"Type": ENTRY_ERROR,
+                     "Contents": f"{command}: Error in API call [{response.status_code}] - {response.text}"}]
+        return [{"Type": ENTRY_NOTE, "Contents": {"response": response.json() if response.content else {}}}]
+
+
+class CommandResults:
+    def __init__(self, outputs_prefix=None, outputs_key_field=None, outputs=None, readable_output=None,
+                 raw_response=None, **kwargs):
+        self.outputs_prefix = outputs_prefix
+        self.outputs_key_field = outputs_key_field
+        self.outputs = outputs
+        self.readable_output = readable_output
+        self.raw_response = raw_response
+
+
+class BaseClient:
+    """The part of CommonServerPython's BaseClient the integration uses."""
+
+    def __init__(self, base_url, verify=True, proxy=False, ok_codes=(), headers=None, **kwargs):
+        self._base_url = base_url.rstrip('/')
+        self._verify = verify
+        self._ok_codes = ok_codes
+        self._headers = headers or {}
+        self._session = requests.Session()
+
+    def _http_request(self, method, url_suffix='', full_url=None, headers=None, params=None, data=None, json_data=None,
+                      files=None, timeout=None, resp_type='json', ok_codes=None, **kwargs):
+        response = self._session.request(method, full_url or self._base_url + url_suffix,
+                                         headers=headers or self._headers, params=params, data=data, json=json_data,
+                                         files=files, verify=self._verify, timeout=timeout)
+        if response.status_code not in (ok_codes or self._ok_codes or range(200, 300)):
+            raise DemistoException(f"Error in API call [{response.status_code}] - {response.reason}\n{response.text}",
+                                   res=response)
+        if resp_type == 'json':
+            return response.json()
+        if resp_type == 'text':
+            return response.text
+        if resp_type == 'content':
+            return response.content
+        return response
+
+
+class ScriptResult:
+    """The entries, outputs and error of a script execution."""
+
+    def __init__(self, entries, error):
+        self.entries = entries
+        self.error = error
+
+    @property
+    def outputs(self):
+        outputs = []
+        for entry in self.entries:
+            if isinstance(entry, CommandResults) and entry.outputs is not None:
+                outputs.extend(entry.outputs if isinstance(entry.outputs, list) else [entry.outputs])
+        return outputs
+
+
+def common_server_globals(demisto, integration_context=None):
+    """The CommonServerPython names used by the pack scripts and integration, bound to a Demisto execution."""
+    integration_context = integration_context or IntegrationContext()
+
+    def is_error(res):
+        res = res if isinstance(res, list) else [res]
+        return any(isinstance(entry, dict) and entry.get('Type') == ENTRY_ERROR for entry in res)
+
+    def get_error(res):
+        res = res if isinstance(res, list) else [res]
+        return '\n'.join(str(entry.get('Contents')) for entry in res if entry.get('Type') == ENTRY_ERROR)
+
+    def execute_command(command, args, extract_contents=True, fail_on_error=True):
+        res = demisto.executeCommand(command, args)
+        if is_error(res):
+            if fail_on_error:
+                raise ScriptError(get_error(res))
+            return False, get_error(res)
+        contents = [entry.get('Contents') for entry in res] if extract_contents else res
+        return True, contents[0] if len(contents) == 1 else contents
+
+    def return_results(results):
+        for result in results if isinstance(results, list) else [results]:
+            demisto.results(result)
+
+    def return_error(message, error=None, outputs=None):
+        demisto.results({"Type": ENTRY_ERROR, "Contents": message})
+        raise ScriptError(message)
+
+    def arg_to_list(arg, separator=','):
+        if not arg:
+            return []
+        if isinstance(arg, list):
+            return arg
+        if isinstance(arg, str) and arg.startswith('['):
+            return json.loads(arg)
+        return [x.strip() for x in str(arg).split(separator)]
+
+    def arg_to_number(arg, arg_name=None, required=False):
+        if arg in (None, ''):
+            return None
+        return int(float(arg))
+
+    def arg_to_boolean(value):
+        if isinstance(value, bool):
+            return value
+        return str(value).lower() in ('yes', 'true')
+
+    def file_result(filename, data):
+        return {"Type": 3, "File": filename, "Contents": data}
+
+    def table_to_markdown(name, t, headers=None, removeNull=False, **kwargs):
+        return f"### {name}\n{json.dumps(t, default=str)}"
+
+    def set_integration_context(context, sync=True, version=-1):
+        integration_context.set(context, version)
+
+    namespace = {name: getattr(typing, name) for name in typing.__all__}
+    namespace.update({
+        '__name__': 'builtins',
+        'demisto': demisto,
+        'json': json,
+        'os': os,
+        'time': time,
+        'requests': requests,
+        'CommandResults': CommandResults,
+        'BaseClient': BaseClient,
+        'DemistoException': DemistoException,
+        'DBotScoreReliability': type('DBotScoreReliability', (), {'C': 'C - Fairly reliable'}),
+        'get_integration_context': lambda sync=True: integration_context.get(),
+        'get_integration_context_with_version': lambda sync=True: integration_context.get_with_version(),
+        'set_integration_context': set_integration_context,
+        'execute_command': execute_command,
+        'is_error': is_error,
+        'get_error': get_error,
+        'return_results': return_results,
+        'return_error': return_error,
+        'argToList': arg_to_list,
+        'arg_to_number': arg_to_number,
+        'argToBoolean': arg_to_boolean,
+        'tableToMarkdown': table_to_markdown,
+        'fileResult': file_result,
+        'entryTypes': {'note': ENTRY_NOTE, 'error': ENTRY_ERROR, 'file': 3},
+        'formats': {'json': 'json', 'text': 'text', 'markdown': 'markdown'},
+        'register_module_line': lambda *args, **kwargs: None,
+        '__line__': lambda: 0,
+    })
+    return namespace
+
+
+_SCRIPT_CACHE = {}
+
+
+def load_script(path):
+    """Returns the compiled code of a pack YAML script."""
+    if path not in _SCRIPT_CACHE:
+        with open(path, 'r', encoding='utf-8') as f:
+            script = yaml.safe_load(f)['script']
+        code = script['script'] if isinstance(script, dict) else script
+        _SCRIPT_CACHE[path] = compile(code, path, 'exec')
+    return _SCRIPT_CACHE[path]
+
+
+def run_script(path, base_url, args=None, context=None, headers=None, debug=False, commands=None,
+               serialize_commands=False):
+    """
+    Runs a pack YAML script once against the tenant at base_url, returns its ScriptResult. `commands` maps the
+    commands other than core-api-* to a function of their args returning their entries. serialize_commands runs the
+    executeCommand calls one at a time, as an engine does.
+    """
+    demisto = Demisto(base_url, args or {}, context or {}, headers=headers, debug=debug, commands=commands,
+                      serialize_commands=serialize_commands)
+    error = None
+    try:
+        exec(load_script(path), common_server_globals(demisto))
+    except ScriptError as e:
+        error = str(e)
+    return ScriptResult(demisto.entries, error)
+
+
+class Integration:
+    """An instance of a pack YAML integration, its commands run against the tenant at base_url."""
+
+    def __init__(self, path, base_url, params=None, debug=False):
+        self.path = path
+        self.base_url = base_url
+        self.params = params or {}
+        self.debug = debug
+        self.context = IntegrationContext()
+
+    def run(self, command, args=None, context=None):
+        """Runs a command of the instance once, returns its ScriptResult."""
+        demisto = Demisto(self.base_url, args or {}, context or {}, debug=self.debug, params=self.params,
+                          command=command)
+        error = None
+        try:
+            exec(load_script(self.path), common_server_globals(demisto, self.context))
+        except ScriptError as e:
+            error = str(e)
+        return ScriptResult(demisto.entries, error)
+
+    def execute(self, command, args):
+        """Runs a command for a script's executeCommand, returns its entries."""
+        result = self.run(command, args)
+        if result.error:
+            return [{"Type": ENTRY_ERROR, "Contents": result.error}]
+        return [{"Type": ENTRY_NOTE, "Contents": entry.raw_response if entry.raw_response is not None else entry.outputs}
+                if isinstance(entry, CommandResults) else entry for entry in result.entries]
+
+    def commands(self, names):
+        """The `commands` of run_script answered by this instance."""
+        return {name: (lambda args, name=name: self.execute(name, args)) for name in names}
@@ -3,20 +3,17 @@ import os
 import shutil
 from typing import Any, Dict, List, Union
 
+import requests
 import yaml
 import time
 
-import requests
-from click.exceptions import Exit
 from dotenv import load_dotenv
 
+from api_tracing import SESSION, report
+
 load_dotenv(dotenv_path='.env')
 os.environ['DEMISTO_SDK_IGNORE_CONTENT_WARNING'] = "yes"
 
-from demisto_sdk.commands.init.initiator import Initiator
-from demisto_sdk.commands.download.downloader import Downloader
-from demisto_sdk.commands.common.tools import parse_marketplace_kwargs
-
 INTEGRATION_INSTANCE_EXCLUDED_FIELDS = ["id", "cacheVersn", "sequenceNumber", "primaryTerm", "modified", "sizeInBytes", "sortValues", "packID", "packName", "itemVersion", "fromServerVersion", "toServerVersion", "definitionId", "prevName", "password", "configvalues", "configtypes", "path", "executable", "cmdline", "hidden", "islongRunning", "remoteSync", "isSystemIntegration", "commandsPermissions", "longRunningId", "incidentFetchInterval", "eventFetchInterval", "assetsFetchInterval", "servicesID", "isBuiltin", "hybrid", "displayPassword", "mappable", "remoteSyncableIn", "remoteSyncableOut", "isFetchSamples", "debugMode"]
 JOB_EXCLUDED_FIELDS = ["id", "version", "cacheVersn", "sequenceNumber", "primaryTerm", "modified", "sizeInBytes", "account", "autime", "rawType", "rawName", "status", "custom_status", "resolution_status", "reason", "created", "occurred", "closed", "sla", "investigationId", "attachment", "openDuration", "lastOpen", "closingUserId", "activated", "closeReason", "rawCloseReason", "closeNotes", "dueDate", "reminder", "runStatus", "notifyTime", "rawPhase", "isPlayground", "rawJSON", "parent", "parentXDRIncident", "retained", "category", "rawCategory", "linkedIncidents", "linkedCount", "droppedCount", "sourceInstance", "sourceBrand", "canvases", "lastJobRunTime", "feedBased", "dbotMirrorId", "dbotMirrorInstance", "dbotMirrorDirection", "dbotDirtyFields", "dbotCurrentDirtyFields", "dbotMirrorTags", "dbotMirrorLastSync", "isDebug", "timezoneOffset", "timezone", "scheduledEntryGuid", "minutesToTimeout", "description", "currentIncidentId", "isCurrentIncidentManual", "lastRunTime", "nextRunTime", "displayNextRunTime", "disabledNextRunTime", "schedulingStatus", "previousRunStatus"]
 DEMISTO_BASE_URL = os.getenv("DEMISTO_BASE_URL", "")
@@ -49,7 +46,7 @@ def verify_credentials():
 
     :return: None, exits if incorrect credentials were received.
     """
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/settings/credentials",
         headers=headers,
         json={})
@@ -74,29 +71,43 @@ def _call(method: str, path: str, body: Union[dict, None] = None, retries: int =
     Uses the request library to call the XSIAM tenant, passes the JSON data back or raises
     an exception
 
+    Only connection errors and server errors (5xx) are retried here: SESSION already retried the throttled calls
+    (429), and other client errors would fail again.
+
     :param path: str, path for API endpoint resource
     :param body: dict, body of call
     :return: dict, response body or exception
     """
     for _ in range(retries):
         try:
-            response = requests.request(
+            response = SESSION.request(
                 method=method,
                 url=f"{DEMISTO_BASE_URL}{path}",
                 headers=headers,
                 json=body,
+                attempt=_ + 1,
             )
             if response.status_code in [200, 201]:
                 return response.status_code, response.json()
 
-            raise Exception(f"Request to {path} errored: {response.status_code}: {response.text}")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = str(e)
 
         except Exception as e:
-            print(f"Request to {path} errored, retries at {_} {e}")
-            if _ == retries - 1:
+            print(f"Request to {path} errored: {e}")
+            return None, None
+
+        else:
+            error = f"{response.status_code}: {response.text}"
+            if response.status_code < 500:
+                print(f"Request to {path} errored: {error}")
                 return None, None
 
-            time.sleep(15)
+        print(f"Request to {path} errored, retries at {_} {error}")
+        if _ == retries - 1:
+            return None, None
+
+        time.sleep(15)
 
 
 def init_empty_package(packs_path: str, name: str = "POVContentPack") -> None:
@@ -107,6 +118,11 @@ def init_empty_package(packs_path: str, name: str = "POVContentPack") -> None:
     if os.path.exists(pack_path):
         return
 
+    # demisto-sdk takes seconds to import, so it's only imported once the environment and credentials are verified
+    from click.exceptions import Exit
+    from demisto_sdk.commands.common.tools import parse_marketplace_kwargs
+    from demisto_sdk.commands.init.initiator import Initiator
+
     try:
         initiator = Initiator(
             marketplace=parse_marketplace_kwargs({"xsiam": True}),
@@ -152,6 +168,9 @@ def init_empty_package(packs_path: str, name: str = "POVContentPack") -> None:
 
 
 def download_content_from_sdk(path: str) -> None:
+    from click.exceptions import Exit
+    from demisto_sdk.commands.download.downloader import Downloader
+
     try:
         Downloader(
             output=path,
@@ -439,4 +458,8 @@ def __main__():
               ".env file to run the setup.py script.\n\n")
 
 
-__main__()
+if __name__ == "__main__":
+    try:
+        __main__()
+    finally:
+        report()
@@ -2,11 +2,18 @@
 fix_errors.py
 -------------
 
-Automates fixing demisto-sdk validation errors (currently supports [BA106]).
-Ensures content items have a valid `fromversion` (YAML) or `fromVersion` (JSON).
+Automates fixing demisto-sdk validation errors through a registry of rules
+(see RULES; currently supports [BA106]). One pass over the SDK output dispatches
+every code, and all fixes to the same file are applied with a single load/dump.
+
+[BA106] ensures content items have a valid `fromversion` (YAML) or `fromVersion` (JSON).
 
 Usage:
-    # Capture validator output
+    # Validate in-process and fix until clean (git changed files, or -i paths)
+    python3 fix_errors.py --validate
+    python3 fix_errors.py --validate -i Packs/soc-crowdstrike-falcon
+
+    # Or capture validator output
     demisto-sdk validate -i Packs/soc-crowdstrike-falcon -g 2>&1 | tee sdk_errors.txt
 
     # Preview (no writes)
@@ -21,14 +28,25 @@ Options:
     sdk_output     Path to saved SDK validation output (e.g., sdk_errors.txt)
     --repo-root    Repo root to resolve relative paths (default: current dir)
     --dry-run      Show what would change without writing files
+    --jobs         Worker processes used to fix files (default: 1)
+    --full-parse   Always use the full YAML parser (disables the fast path)
+    --validate     Run `demisto-sdk validate` in-process on the changed files (-i to
+                   choose them) and loop validate->fix until clean (--max-rounds)
+    --index-cache  Persist the repo file index (e.g. .fix_errors_index.json);
+                   it is rebuilt automatically when files are added/removed.
+                   The index is only built once a reported path doesn't exist
+                   under the repo root as is
 
 Notes:
-    - YAML: sets/normalizes `fromversion` (lowercase). If YAML is malformed,
-      falls back to a safe textual edit (regex/insert) and continues.
+    - YAML: sets/normalizes `fromversion` (lowercase). Plain top-level mappings
+      are edited textually (fast path); otherwise the full parser is used, and if
+      the YAML is malformed, a safe textual edit (regex/insert).
     - JSON: sets/normalizes `fromVersion` (camelCase); removes wrong-case key.
-    - Minimum version applied is whatever the SDK reports per line (e.g., 5.0.0 / 6.5.0).
+    - Minimum version applied is the highest the SDK reports for the file (e.g., 5.0.0 / 6.5.0);
+      each file is parsed and written once, however many lines report it.
     - No backup files are created — commit first if you want rollback.
-    - Designed so you can extend for other validation codes later.
+    - To support another validation code, write an in-place fixer and
+      register_rule(Rule(code, matcher, parse, fix, merge)) it.
 
 """
 #!/usr/bin/env python3
@@ -36,7 +54,6 @@ import argparse
 import json
 import os
 import re
-import glob
 
 # Optional YAML libs (ruamel preferred for formatting preservation)
 try:
@@ -65,6 +82,7 @@ BA106_RE = re.compile(
 )
 
 SEMVER_NUM_RE = re.compile(r'\d+')
+SEMVER_RE = re.compile(r'\d+\.\d+\.\d+')
 
 def parse_semver(v: str):
     if not v or not isinstance(v, str):
@@ -78,7 +96,117 @@ def parse_semver(v: str):
 def max_version(a: str, b: str) -> str:
     return a if parse_semver(a) >= parse_semver(b) else b
 
-def resolve_path(repo_root: str, rel_path: str) -> str:
+def ba106_result_min_version(entry: dict):
+    """
+    Minimum version of a structured BA106 result. The results carry no version field, but
+    the message names both the required and the current version, and the current one is
+    below the required one or BA106 wouldn't be reported, so the highest is the minimum.
+    """
+    versions = SEMVER_RE.findall(entry.get('message') or '')
+    if not versions:
+        return None
+    result = versions[0]
+    for version in versions[1:]:
+        result = max_version(result, version)
+    return result
+
+# --- Repo index --------------------------------------------------------------
+
+INDEX_SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv'}
+INDEX_CACHE_VERSION = 1
+
+class RepoIndex:
+    """
+    basename -> repo-relative paths map, built with a single walk of the repo so
+    every SDK-reported path resolves with a dict lookup instead of a recursive glob.
+
+    The index can be persisted to a JSON cache. It stores the mtime of every
+    directory walked; adding, removing or renaming a file bumps its directory's
+    mtime, so a cache is reused only while all directory mtimes still match.
+    """
+
+    def __init__(self, repo_root: str, by_name=None, dir_mtimes=None):
+        self.repo_root = repo_root
+        self.by_name = by_name if by_name is not None else {}
+        self.dir_mtimes = dir_mtimes if dir_mtimes is not None else {}
+
+    @classmethod
+    def build(cls, repo_root: str):
+        index = cls(repo_root)
+        for dirpath, dirnames, filenames in os.walk(repo_root):
+            dirnames[:] = [d for d in dirnames if d not in INDEX_SKIP_DIRS]
+            rel_dir = os.path.relpath(dirpath, repo_root)
+            index.dir_mtimes[rel_dir] = os.stat(dirpath).st_mtime
+            for name in filenames:
+                rel = os.path.normpath(os.path.join(rel_dir, name)).replace(os.sep, '/')
+                index.by_name.setdefault(name, []).append(rel)
+        return index
+
+    @classmethod
+    def load(cls, repo_root: str, cache_path: str = None):
+        """Loads the cached index if still valid, otherwise (re)builds it and saves the cache."""
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('version') == INDEX_CACHE_VERSION and cached.get('repo_root') == repo_root:
+                    index = cls(repo_root, cached['by_name'], cached['dir_mtimes'])
+                    if index.is_fresh():
+                        return index
+            except (OSError, ValueError, KeyError):
+                pass
+
+        index = cls.build(repo_root)
+        if cache_path:
+            index.save(cache_path)
+        return index
+
+    def is_fresh(self) -> bool:
+        for rel_dir, mtime in self.dir_mtimes.items():
+            try:
+                if os.stat(os.path.join(self.repo_root, rel_dir)).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def save(self, cache_path: str):
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_CACHE_VERSION,
+                'repo_root': self.repo_root,
+                'dir_mtimes': self.dir_mtimes,
+                'by_name': self.by_name,
+            }, f)
+
+    def lookup(self, rel_path: str):
+        """Returns the best indexed match for rel_path (absolute), or None."""
+        tail = rel_path.replace('\\', '/').lstrip('/')
+        hits = self.by_name.get(os.path.basename(tail))
+        if not hits:
+            return None
+        # Prefer paths ending with the full reported tail, then the shortest path
+        suffix_hits = [h for h in hits if h == tail or h.endswith('/' + tail)]
+        best = sorted(suffix_hits or hits, key=len)[0]
+        return os.path.join(self.repo_root, best.replace('/', os.sep))
+
+class LazyRepoIndex:
+    """
+    RepoIndex.load deferred to the first lookup, so a run whose reported paths
+    all resolve with a plain join never walks the repo or reads the cache.
+    """
+
+    def __init__(self, repo_root: str, cache_path: str = None):
+        self.repo_root = repo_root
+        self.cache_path = cache_path
+        self.index = None
+
+    def lookup(self, rel_path: str):
+        if self.index is None:
+            self.index = RepoIndex.load(self.repo_root, self.cache_path)
+        return self.index.lookup(rel_path)
+
+def resolve_path(repo_root: str, rel_path: str, index: RepoIndex = None) -> str:
     rp = rel_path.strip().rstrip(':').replace('\\', os.sep)
 
     # 1) Simple join
@@ -90,20 +218,12 @@ def resolve_path(repo_root: str, rel_path: str) -> str:
     if os.path.isabs(rp) and os.path.exists(rp):
         return rp
 
-    # 3) Search for full tail under repo
-    candidates = glob.glob(os.path.join(repo_root, '**', rp), recursive=True)
-    if candidates:
-        return sorted(candidates, key=lambda x: len(x))[0]
-
-    # 4) Basename-only search fallback
-    base = os.path.basename(rp)
-    if base:
-        hits = glob.glob(os.path.join(repo_root, '**', base), recursive=True)
-        if hits:
-            for h in hits:
-                if h.replace('\\', '/').endswith(rp.replace('\\', '/')):
-                    return h
-            return sorted(hits, key=lambda x: len(x))[0]
+    # 3) Full tail, then basename-only, via the repo index
+    if index is None:
+        index = RepoIndex.build(repo_root)
+    hit = index.lookup(rp)
+    if hit:
+        return hit
 
     return p1
 
@@ -181,119 +301,445 @@ def textual_fix_yaml(path: str, min_version: str, dry_run: bool):
             f.write(''.join(new_lines))
     return True, f"INSERTED (textual): {path} -> fromversion={min_version}"
 
-# --- Fixers ------------------------------------------------------------------
-
-def fix_yaml(path: str, min_version: str, dry_run: bool):
-    # Try structured YAML first; on failure, do textual fallback
-    try:
-        data, engine = load_yaml(path)
-    except Exception as e:
-        # Malformed YAML: fall back to textual manipulation
-        return textual_fix_yaml(path, min_version, dry_run)
+# --- Fast textual path for top-level keys -------------------------------------
+# Editing one top-level key does not need the full document tree. When a cheap
+# line scan shows the file is a plain top-level block mapping, every column-0
+# `key:` line is a top-level key, so the edit is done on the text directly.
+# Anything the scan cannot vouch for falls back to the full parser.
 
-    lower = str(data.get('fromversion') or '')
-    camel = str(data.get('fromVersion') or '')
-    effective = lower or ''
-    if camel and parse_semver(camel) > parse_semver(effective or '0.0.0'):
-        effective = camel
+TOP_KEY_RE = re.compile(r'^[A-Za-z_][\w.-]*[ \t]*:(?=[ \t]|$)')
 
-    new_val = max_version(effective or '0.0.0', min_version)
+def is_plain_top_level_mapping(text: str) -> bool:
+    """
+    Structural check: a single document whose column-0 lines are all simple
+    `key: value` entries (or `- item` lines of a top-level key's sequence), with
+    no quoted or flow value left open across lines.
+    """
+    seen_key = False
+    for i, line in enumerate(text.split('\n')):
+        line = line.rstrip('\r')
+        if not line or line[0] in ' #':
+            continue
+        if i == 0 and line.rstrip() == '---':
+            continue
+        if line.startswith('- ') or line.rstrip() == '-':
+            if not seen_key:
+                return False
+            continue
+        m = TOP_KEY_RE.match(line)
+        if not m:
+            return False
+        seen_key = True
+        value = line[m.end():].strip()
+        if value[:1] in ('"', "'") and (len(value) < 2 or not value.endswith(value[0])):
+            return False
+        if value[:1] in ('[', '{') and value.count('[') + value.count('{') != value.count(']') + value.count('}'):
+            return False
+    return seen_key
 
-    if effective and parse_semver(effective) >= parse_semver(min_version):
-        if 'fromVersion' in data and 'fromversion' not in data:
-            if not dry_run:
-                data['fromversion'] = camel
-                del data['fromVersion']
-                dump_yaml(path, data, engine)
-            return True, f"NORMALIZED: {path} -> fromVersion→fromversion={camel}"
-        return False, f"OK (no change): {path} (fromversion={effective})"
-
-    if 'fromVersion' in data:
-        data.pop('fromVersion', None)
-    data['fromversion'] = new_val
-    if not dry_run:
-        dump_yaml(path, data, engine)
-    return True, f"UPDATED: {path} -> fromversion={new_val}"
+# --- Fixers ------------------------------------------------------------------
+# A fixer mutates an already-loaded document in place and returns (changed, msg);
+# kind is 'yaml' or 'json'. fix_file loads and dumps each file once for all of them.
 
-def fix_json(path: str, min_version: str, dry_run: bool):
-    with open(path, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError:
-            return False, f"SKIP (invalid JSON): {path}"
+def fix_fromversion(data, kind: str, path: str, min_version: str):
+    # YAML content uses `fromversion`, JSON content uses `fromVersion`
+    key, wrong_key = ('fromversion', 'fromVersion') if kind == 'yaml' else ('fromVersion', 'fromversion')
 
-    camel = str(data.get('fromVersion') or '')
-    wrong = str(data.get('fromversion') or '')
-    effective = camel or ''
+    right = str(data.get(key) or '')
+    wrong = str(data.get(wrong_key) or '')
+    effective = right or ''
     if wrong and parse_semver(wrong) > parse_semver(effective or '0.0.0'):
         effective = wrong
 
     new_val = max_version(effective or '0.0.0', min_version)
 
     if effective and parse_semver(effective) >= parse_semver(min_version):
-        changed = False
-        if 'fromversion' in data and 'fromVersion' not in data:
-            data['fromVersion'] = data['fromversion']
-            del data['fromversion']
-            changed = True
-        if changed and not dry_run:
-            with open(path, 'w', encoding='utf-8') as wf:
-                json.dump(data, wf, indent=2, ensure_ascii=False)
-            return True, f"NORMALIZED: {path} -> fromversion→fromVersion={data['fromVersion']}"
-        return False, f"OK (no change): {path} (fromVersion={effective})"
+        if wrong_key in data and key not in data:
+            data[key] = data[wrong_key]
+            del data[wrong_key]
+            return True, f"NORMALIZED: {path} -> {wrong_key}→{key}={data[key]}"
+        return False, f"OK (no change): {path} ({key}={effective})"
 
-    data['fromVersion'] = new_val
-    if 'fromversion' in data:
-        del data['fromversion']
-    if not dry_run:
-        with open(path, 'w', encoding='utf-8') as wf:
-            json.dump(data, wf, indent=2, ensure_ascii=False)
-    return True, f"UPDATED: {path} -> fromVersion={new_val}"
+    data.pop(wrong_key, None)
+    data[key] = new_val
+    return True, f"UPDATED: {path} -> {key}={new_val}"
+
+TOP_FROMVERSION_RE = re.compile(r'(?m)^(?P<key>from[vV]ersion)[ \t]*:(?P<rest>[^\n]*)$')
+FROMVERSION_VALUE_RE = re.compile(r'^[ \t]*(?P<q>[\'"]?)(?P<val>\d+\.\d+\.\d+)(?P=q)[ \t]*(?:#.*)?\r?$')
+
+def fast_fix_fromversion(text: str, path: str, min_version: str):
+    """
+    Fast path of fix_fromversion for YAML text that passed is_plain_top_level_mapping.
+    Returns (changed, new_text, msg), or None when the full parser is needed
+    (duplicate or camelCase keys, unusual values).
+    """
+    matches = list(TOP_FROMVERSION_RE.finditer(text))
+    if len(matches) > 1:
+        return None
 
-def fix_file(path: str, min_version: str, dry_run: bool = False):
+    if not matches:
+        sep = '' if not text or text.endswith('\n') else '\n'
+        return True, f"{text}{sep}fromversion: {min_version}\n", f"UPDATED: {path} -> fromversion={min_version}"
+
+    m = matches[0]
+    value = FROMVERSION_VALUE_RE.match(m.group('rest'))
+    if m.group('key') != 'fromversion' or not value:
+        return None
+
+    current = value.group('val')
+    if parse_semver(current) >= parse_semver(min_version):
+        return False, text, f"OK (no change): {path} (fromversion={current})"
+
+    start = m.start('rest') + value.start('val')
+    end = m.start('rest') + value.end('val')
+    return True, text[:start] + min_version + text[end:], f"UPDATED: {path} -> fromversion={min_version}"
+
+def fast_fix_file(path: str, fixes: dict, dry_run: bool):
+    """
+    Applies the fixes on the YAML text with the rules' fast fixers and writes it once.
+    Returns None when any fix needs the full parser.
+    """
+    if not all(RULES[code].fast_fix for code in fixes):
+        return None
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    if not is_plain_top_level_mapping(text):
+        return None
+
+    changed = False
+    messages = []
+    for code, param in fixes.items():
+        result = RULES[code].fast_fix(text, path, param)
+        if result is None:
+            return None
+        fix_changed, text, msg = result
+        changed = changed or fix_changed
+        messages.append(msg)
+
+    if changed and not dry_run:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+    return changed, '\n'.join(messages)
+
+def fix_file(path: str, fixes: dict, dry_run: bool = False, fast: bool = True):
+    """
+    Applies all planned fixes ({code: param}) to a file with a single load/dump.
+    YAML goes through the fast textual path first when `fast` is set.
+    Returns (changed, msg) with one message line per fix.
+    """
     ext = os.path.splitext(path)[1].lower()
     if not os.path.exists(path):
         return False, f"SKIP (missing): {path}"
+
     if ext in ('.yml', '.yaml'):
-        return fix_yaml(path, min_version, dry_run)
-    if ext == '.json':
-        return fix_json(path, min_version, dry_run)
-    return False, f"SKIP (unknown ext): {path}"
+        kind = 'yaml'
+        if fast:
+            result = fast_fix_file(path, fixes, dry_run)
+            if result is not None:
+                return result
+        # Try structured YAML first; on failure, do textual fallback
+        try:
+            data, engine = load_yaml(path)
+        except Exception:
+            return textual_fix_file(path, fixes, dry_run)
+    elif ext == '.json':
+        kind = 'json'
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                return False, f"SKIP (invalid JSON): {path}"
+    else:
+        return False, f"SKIP (unknown ext): {path}"
+
+    changed = False
+    messages = []
+    for code, param in fixes.items():
+        fix_changed, msg = RULES[code].fix(data, kind, path, param)
+        changed = changed or fix_changed
+        messages.append(msg)
+
+    if changed and not dry_run:
+        if kind == 'yaml':
+            dump_yaml(path, data, engine)
+        else:
+            with open(path, 'w', encoding='utf-8') as wf:
+                json.dump(data, wf, indent=2, ensure_ascii=False)
+    return changed, '\n'.join(messages)
+
+def textual_fix_file(path: str, fixes: dict, dry_run: bool):
+    """Malformed YAML: apply the fixes whose rule has a textual fallback."""
+    changed = False
+    messages = []
+    for code, param in fixes.items():
+        rule = RULES[code]
+        if not rule.text_fix:
+            messages.append(f"SKIP (malformed YAML, no textual fixer for {code}): {path}")
+            continue
+        fix_changed, msg = rule.text_fix(path, param, dry_run)
+        changed = changed or fix_changed
+        messages.append(msg)
+    return changed, '\n'.join(messages)
+
+# --- Rules -------------------------------------------------------------------
+
+# Any SDK finding line, e.g. "Packs/foo/Playbooks/bar.yml: [BA106] - ..."
+FINDING_RE = re.compile(r'^(?P<path>[^:]+):\s*\[(?P<code>[A-Z]+\d+)\]', re.IGNORECASE)
+
+class Rule:
+    """
+    A fixable SDK validation code.
+
+      matcher   compiled regex run on the finding line
+      parse     match -> fix parameter (e.g. the minimum version for BA106)
+      parse_result
+                optional structured SDK result (dict) -> fix parameter, or None when the
+                result doesn't hold it; results of codes without it are unhandled
+      merge     combines the parameters of several findings on the same file
+      fix       in-place fixer, see the Fixers section
+      text_fix  optional (path, param, dry_run) -> (changed, msg) for malformed YAML
+      fast_fix  optional (text, path, param) -> (changed, text, msg) or None, the
+                fast textual path for YAML (see fast_fix_file)
+    """
+
+    def __init__(self, code, matcher, parse, fix, merge=None, text_fix=None, fast_fix=None, parse_result=None):
+        self.code = code.upper()
+        self.matcher = matcher
+        self.parse = parse
+        self.parse_result = parse_result
+        self.fix = fix
+        self.merge = merge or (lambda old, new: new)
+        self.text_fix = text_fix
+        self.fast_fix = fast_fix
+
+RULES = {}
+
+def register_rule(rule: Rule) -> Rule:
+    RULES[rule.code] = rule
+    return rule
+
+register_rule(Rule(
+    'BA106',
+    BA106_RE,
+    parse=lambda m: m.group('min').strip(),
+    parse_result=ba106_result_min_version,
+    fix=fix_fromversion,
+    merge=max_version,
+    text_fix=textual_fix_yaml,
+    fast_fix=fast_fix_fromversion,
+))
+
+# --- Planning ----------------------------------------------------------------
+
+def line_findings(lines):
+    """
+    Parses SDK output lines into (code, rel_path, param, source) findings; param is None
+    when the code has no rule or its rule doesn't match the line.
+    """
+    for raw in lines:
+        line = de_ansi(raw)
+        finding = FINDING_RE.search(line)
+        if not finding:
+            continue
+
+        code = finding.group('code').upper()
+        rule = RULES.get(code)
+        m = rule.matcher.search(line) if rule else None
+        if not m:
+            yield code, finding.group('path'), None, line
+            continue
+        yield code, m.group('path'), rule.parse(m), line
+
+def result_findings(results):
+    """
+    Reads (code, rel_path, param, source) findings from the structured SDK JSON results
+    (legacy list or new {"validations": [...]} format): the code and path come from the
+    result fields, and the fix parameter from the rule's parse_result.
+    """
+    if isinstance(results, dict):
+        entries = results.get('validations', []) + results.get('invalid content items', [])
+    else:
+        entries = results or []
+    for entry in entries:
+        path = entry.get('filePath') or entry.get('file path') or entry.get('file_path') or ''
+        code = (entry.get('errorCode') or entry.get('error code') or entry.get('error_code') or '').upper()
+        if not path or not code:
+            continue
+        rule = RULES.get(code)
+        param = rule.parse_result(entry) if rule and rule.parse_result else None
+        yield code, path, param, json.dumps(entry)
+
+def plan_findings(findings, repo_root: str, index: RepoIndex):
+    """
+    Streams the findings once, dispatching every finding to its rule, and groups the
+    fixes by resolved file ({path: {code: param}}, params merged per rule), so each file
+    is parsed and written once however many codes and findings report it.
+    Returns (plan in first-seen order, matched count per code, unhandled count per code).
+    """
+    plan = {}
+    matched = {}
+    unhandled = {}
+    for code, rel_path, param, source in findings:
+        if param is None:
+            unhandled[code] = unhandled.get(code, 0) + 1
+            continue
+
+        matched[code] = matched.get(code, 0) + 1
+        rel_path = rel_path.strip().rstrip(':').replace('\\', os.sep)
+        resolved = resolve_path(repo_root, rel_path, index)
+        if not os.path.exists(resolved):
+            print(f"SKIP (missing): finding='{source}'  rel='{rel_path}'  resolved='{resolved}'")
+            continue
+
+        rule = RULES[code]
+        fixes = plan.setdefault(resolved, {})
+        fixes[code] = rule.merge(fixes[code], param) if code in fixes else param
+    return plan, matched, unhandled
+
+def plan_fixes(sdk_output: str, repo_root: str, index: RepoIndex):
+    """plan_findings over a saved SDK validation output file."""
+    with open(sdk_output, 'r', encoding='utf-8', errors='ignore') as f:
+        return plan_findings(line_findings(f), repo_root, index)
+
+def _fix_planned(item):
+    path, fixes, dry_run, fast = item
+    return fix_file(path, fixes, dry_run, fast)
+
+def apply_plan(plan, dry_run: bool, jobs: int = 1, fast: bool = True):
+    """Fixes every planned file once, across a process pool when jobs > 1."""
+    items = [(path, fixes, dry_run, fast) for path, fixes in plan.items()]
+    if jobs > 1 and len(items) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # Results come back in plan order, so the output stays deterministic
+            yield from pool.map(_fix_planned, items, chunksize=max(1, len(items) // (jobs * 4)))
+    else:
+        yield from map(_fix_planned, items)
+
+# --- In-process SDK validation ------------------------------------------------
+# Instead of scraping `demisto-sdk validate` logs, run the validator in this
+# process (the SDK is imported once for all rounds) and read its structured
+# --json-file results. Their code and file path fields are dispatched to the
+# rules directly (see result_findings), without going through the log wording.
+
+def run_sdk_validate(repo_root: str, inputs=None):
+    """
+    Runs `demisto-sdk validate` in-process on `inputs` (changed files from git when
+    None) and returns its JSON results.
+    """
+    import sys
+    import tempfile
+    from importlib.metadata import entry_points
+
+    eps = [ep for ep in entry_points(group='console_scripts') if ep.name == 'demisto-sdk']
+    if not eps:
+        raise RuntimeError("demisto-sdk is not installed in this environment.")
+    cli = eps[0].load()
+
+    fd, json_path = tempfile.mkstemp(prefix='sdk_validate_', suffix='.json')
+    os.close(fd)
+    argv = ['demisto-sdk', 'validate', '--json-file', json_path]
+    argv += ['-i', ','.join(inputs)] if inputs else ['-g']
+
+    old_argv, old_cwd = sys.argv, os.getcwd()
+    sys.argv = argv
+    os.chdir(repo_root)
+    try:
+        cli()
+    except SystemExit:
+        # The SDK exits non-zero when it finds errors, which is expected here
+        pass
+    finally:
+        sys.argv = old_argv
+        os.chdir(old_cwd)
+
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f) if os.path.getsize(json_path) else []
+    finally:
+        os.remove(json_path)
+
+def validate_and_fix(repo_root: str, index: RepoIndex, inputs=None, dry_run: bool = False, jobs: int = 1,
+                     fast: bool = True, max_rounds: int = 5):
+    """
+    validate -> fix until clean: every round re-validates only the files fixed in
+    the previous one. Stops when no fixable finding is left, nothing changed or
+    after max_rounds. Returns the unhandled codes of the last round.
+    """
+    targets = inputs
+    unhandled = {}
+    for round_no in range(1, max_rounds + 1):
+        results = run_sdk_validate(repo_root, targets)
+        plan, matched, unhandled = plan_findings(result_findings(results), repo_root, index)
+        matched_summary = ', '.join(f"{code}={count}" for code, count in matched.items()) or 'none'
+        print(f"Round {round_no}: fixable findings: {matched_summary}. Files: {len(plan)}.")
+        if not plan:
+            print("Clean: no fixable findings left.")
+            break
+
+        changes = 0
+        for changed, msg in apply_plan(plan, dry_run, jobs, fast):
+            print(msg)
+            if changed:
+                changes += 1
+
+        if dry_run or not changes:
+            print(f"Stopping: {'dry-run' if dry_run else 'no file changed'}.")
+            break
+        targets = [os.path.relpath(path, repo_root) for path in plan]
+    else:
+        print(f"Stopping: reached --max-rounds {max_rounds}.")
+    return unhandled
 
 # --- Main --------------------------------------------------------------------
 
 def main():
-    ap = argparse.ArgumentParser(description="Fix BA106 by adding/updating fromversion/fromVersion.")
-    ap.add_argument("sdk_output", help="Path to saved SDK validation output (e.g., sdk_errors.txt)")
+    ap = argparse.ArgumentParser(description=f"Fix demisto-sdk validation errors ({', '.join(RULES)}).")
+    ap.add_argument("sdk_output", nargs='?',
+                    help="Path to saved SDK validation output (e.g., sdk_errors.txt); omit with --validate")
     ap.add_argument("--repo-root", default=".", help="Repo root (default: current dir)")
     ap.add_argument("--dry-run", action="store_true", help="Show what would change without writing files")
+    ap.add_argument("--index-cache", default=None,
+                    help="Persist the repo file index to this JSON file and reuse it while the repo is unchanged")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Number of worker processes used to fix files (default: 1)")
+    ap.add_argument("--full-parse", action="store_true",
+                    help="Always round-trip YAML through the full parser instead of the fast textual path")
+    ap.add_argument("--validate", action="store_true",
+                    help="Run demisto-sdk validate in-process and loop validate->fix until clean")
+    ap.add_argument("-i", "--input", default=None,
+                    help="With --validate: comma-separated paths to validate (default: git changed files)")
+    ap.add_argument("--max-rounds", type=int, default=5, help="With --validate: max validate->fix rounds (default: 5)")
     args = ap.parse_args()
+    if not args.sdk_output and not args.validate:
+        ap.error("either sdk_output or --validate is required")
 
     repo_root = os.path.abspath(args.repo_root)
+    index = LazyRepoIndex(repo_root, args.index_cache)
 
-    total = 0
-    changes = 0
-    with open(args.sdk_output, 'r', encoding='utf-8', errors='ignore') as f:
-        for raw in f:
-            line = de_ansi(raw)
-            m = BA106_RE.search(line)
-            if not m:
-                continue
-
-            total += 1
-            rel_path = m.group('path').strip().rstrip(':').replace('\\', os.sep)
-            resolved = resolve_path(repo_root, rel_path)
-            if not os.path.exists(resolved):
-                print(f"SKIP (missing): raw='{raw.rstrip()}'  parsed='{line}'  rel='{rel_path}'  resolved='{resolved}'")
-                continue
-
-            min_ver = m.group('min').strip()
-            changed, msg = fix_file(resolved, min_ver, args.dry_run)
-            print(msg)
-            if changed:
-                changes += 1
+    if args.validate:
+        inputs = [x.strip() for x in args.input.split(',') if x.strip()] if args.input else None
+        try:
+            unhandled = validate_and_fix(repo_root, index, inputs, args.dry_run, args.jobs, not args.full_parse,
+                                         args.max_rounds)
+        except RuntimeError as e:
+            ap.error(str(e))
+        if unhandled:
+            print(f"Unhandled codes: {', '.join(f'{code}={count}' for code, count in sorted(unhandled.items()))}")
+        return
+
+    plan, matched, unhandled = plan_fixes(args.sdk_output, repo_root, index)
 
-    print(f"\nMatched BA106 lines: {total}. Files changed: {changes}. Dry-run: {args.dry_run}")
+    changes = 0
+    for changed, msg in apply_plan(plan, args.dry_run, args.jobs, not args.full_parse):
+        print(msg)
+        if changed:
+            changes += 1
+
+    matched_summary = ', '.join(f"{code}={count}" for code, count in matched.items()) or 'none'
+    print(f"\nMatched lines: {matched_summary}. Files: {len(plan)}. Files changed: {changes}. Dry-run: {args.dry_run}")
+    if unhandled:
+        print(f"Unhandled codes: {', '.join(f'{code}={count}' for code, count in sorted(unhandled.items()))}")
 
 if __name__ == "__main__":
     main()
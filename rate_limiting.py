@@ -0,0 +1,133 @@
+"""
+rate_limiting.py
+----------------
+
+Token-bucket rate limiting of the calls setup.py, capture.py and removeFramework.py
+make to the XSIAM tenant, shared by all the threads of a run. Buckets are
+keyed by tenant (the host of the URL) and endpoint family, so parallel
+phases run as fast as the tenant allows without tripping its throttling.
+api_tracing.SESSION takes a token before every request, and backs off and
+retries the requests the tenant still throttles (429), holding off the whole
+family.
+
+The rates are set with API_RATE_LIMITS in the environment or the .env file,
+as "family=rate[:burst]" pairs in requests per second, e.g.
+"xql=2:4,xsoar=50". The families missing from API_RATE_LIMITS keep their
+DEFAULT_RATE_LIMITS, and a rate of 0 doesn't limit the family. The pack
+scripts share the same families and defaults, through the POV XSIAM Content
+Management integration.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Requests per second and burst of each endpoint family, as "family=rate[:burst]" pairs
+DEFAULT_RATE_LIMITS = "xql=5:10,public_api=10:20,xsoar=20:40"
+
+
+def rate_limit_family(path: str) -> str:
+    """
+    The endpoint family a path is rate limited with: xql for the XQL and lookup datasets APIs, public_api for the rest
+    of the public API, and xsoar for the XSOAR APIs
+    """
+    path = path.split("?", 1)[0].lstrip("/")
+    if path.startswith("public_api/"):
+        return "xql" if "/xql/" in path else "public_api"
+    return "xsoar"
+
+
+def parse_rate_limits(rate_limits: str = "") -> Dict[str, Tuple[float, float]]:
+    """
+    Parses "family=rate[:burst]" pairs into the requests per second and burst of each family, on top of the
+    DEFAULT_RATE_LIMITS
+    """
+    limits: Dict[str, Tuple[float, float]] = {}
+    for text in (DEFAULT_RATE_LIMITS, rate_limits or ""):
+        for pair in text.split(","):
+            if not pair.strip():
+                continue
+            family, _, value = pair.partition("=")
+            rate, _, burst = value.partition(":")
+            try:
+                limits[family.strip()] = (float(rate), float(burst or rate))
+            except ValueError:
+                raise ValueError(f'Invalid rate limit "{pair.strip()}", expected family=rate[:burst].')
+    return limits
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket handing out reservations: a token is taken at once, the bucket going into debt, and the
+    caller sleeps until the debt is refilled, so waiting threads are served in order without polling.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Takes tokens from the bucket, returns the seconds to wait before using them."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            return max(-self.tokens / self.rate, 0.0)
+
+    def throttle(self, seconds: float) -> None:
+        """Holds off the next reservations for `seconds` at least, after the tenant throttled a request."""
+        if not self.rate:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Token buckets of the run, one per tenant and endpoint family."""
+
+    def __init__(self, rate_limits: Optional[str] = None):
+        self._rate_limits = rate_limits
+        self._limits: Optional[Dict[str, Tuple[float, float]]] = None
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        parts = urlsplit(url)
+        key = (parts.netloc, rate_limit_family(parts.path))
+        with self._lock:
+            if self._limits is None:
+                # Read on first use, after the scripts loaded their .env file
+                rate_limits = self._rate_limits if self._rate_limits is not None else os.getenv("API_RATE_LIMITS", "")
+                self._limits = parse_rate_limits(rate_limits)
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(*self._limits.get(key[1], (0.0, 0.0)))
+            return self._buckets[key]
+
+    def acquire(self, url: str) -> float:
+        """Takes a token for a request to url, sleeping until the tenant's rate allows it. Returns the seconds waited."""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self, url: str, seconds: float) -> None:
+        """Reports a request throttled by the tenant (429), holding off the requests of its family for `seconds`."""
+        bucket = self.bucket(url)
+        if bucket.rate:
+            bucket.throttle(seconds)
+        else:
+            # Families without a rate have no bucket to hold off, back off here
+            time.sleep(seconds)
+
+
+LIMITER = RateLimiter()
@@ -1,8 +1,9 @@
 import os
 
-import requests
 from dotenv import load_dotenv
 
+from api_tracing import SESSION, report
+
 load_dotenv()
 
 DEMISTO_BASE_URL = os.getenv("DEMISTO_BASE_URL", "")
@@ -15,10 +16,11 @@ headers = {"x-xdr-auth-id": str(XSIAM_AUTH_ID), "Authorization": f"{DEMISTO_API_
 
 def delete_job(jobId):
     parameters = {}
-    response = requests.delete(
+    response = SESSION.delete(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/jobs/" + jobId,
         headers=headers,
         json=parameters,
+        endpoint="/xsoar/public/v1/jobs/{id}",
     )
 
     if response.status_code == 200:
@@ -32,7 +34,7 @@ def delete_job(jobId):
 def delete_jobs(jobList):
     for job in jobList:
         parameters = {"query": "name:" + job}
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/jobs/search",
             headers=headers,
             json=parameters,
@@ -51,7 +53,7 @@ def delete_jobs(jobList):
 def delete_datasets(dataSetList):
     for dataset in dataSetList:
         parameters = {"request_data": {"dataset_name": f"{dataset}", "force": "yes"}}
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/public_api/v2/xql/delete_dataset",
             headers=headers,
             json=parameters,
@@ -72,7 +74,7 @@ def delete_script(script: str):
         },
     }
 
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/automation/delete", headers=headers, json=data
     )
 
@@ -87,7 +89,7 @@ def delete_script(script: str):
 def delete_scripts(script_list: list):
     for script in script_list:
         parameters = {"query": "name:" + script}
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/automation/search",
             headers=headers,
             json=parameters,
@@ -106,7 +108,7 @@ def delete_scripts(script_list: list):
 def delete_playbook(playbookID):
     parameters = {"request_data": {"filter": {"field": "id", "value": str(playbookID)}}}
 
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/public_api/v1/playbooks/delete",
         headers=headers,
         json=parameters,
@@ -123,7 +125,7 @@ def delete_playbook(playbookID):
 def delete_playbooks(playbookLIst):
     for playbook in playbookLIst:
         parameters = {"query": playbook}
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/playbook/search",
             headers=headers,
             json=parameters,
@@ -145,10 +147,11 @@ def delete_playbooks(playbookLIst):
 def delete_layout(layoutID):
     parameters = {"ids": [str(layoutID)]}
 
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/layout/" + str(layoutID) + "/remove",
         headers=headers,
         json={},
+        endpoint="/xsoar/layout/{id}/remove",
     )
 
     if response.status_code == 200:
@@ -165,7 +168,7 @@ def delete_layouts(layoutList):
             "request_data": {"filter": {"field": "name", "value": str(layout)}}
         }
 
-        response = requests.get(
+        response = SESSION.get(
             url=f"{DEMISTO_BASE_URL}/xsoar/layouts", headers=headers, json=parameters
         )
 
@@ -184,10 +187,11 @@ def delete_layouts(layoutList):
 
 
 def delete_incident_field(incident_field):
-    response = requests.delete(
+    response = SESSION.delete(
         url=f"{DEMISTO_BASE_URL}/xsoar/incidentfield/{incident_field}",
         headers=headers,
-        json={})
+        json={},
+        endpoint="/xsoar/incidentfield/{id}")
 
     if response.status_code == 200:
         json_results = response.json()
@@ -196,7 +200,7 @@ def delete_incident_field(incident_field):
 
 
 def delete_incident_fields(incident_fields: list[str]):
-    response = requests.get(
+    response = SESSION.get(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/incidentfields",
         headers=headers)
     if response.status_code == 200:
@@ -211,7 +215,7 @@ def delete_incident_fields(incident_fields: list[str]):
 
 
 def delete_list(l_id: str):
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/lists/delete",
         headers=headers,
         json={"id": l_id})
@@ -223,7 +227,7 @@ def delete_list(l_id: str):
 
 
 def delete_lists(lists: list[str]):
-    response = requests.get(
+    response = SESSION.get(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/lists",
         headers=headers)
     if response.status_code == 200:
@@ -249,7 +253,7 @@ def delete_dashboards(dashboards: list[str]):
             }
         }
 
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/public_api/v1/dashboards/delete",
             headers=headers,
             json=data
@@ -272,7 +276,7 @@ def delete_widgets(widgets: list[str]):
             }
         }
 
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/public_api/v1/widgets/delete",
             headers=headers,
             json=data
@@ -284,7 +288,7 @@ def delete_widgets(widgets: list[str]):
 
 
 def delete_integration(integration: str):
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/settings/integration-conf/delete",
         headers=headers,
         json={"id": integration})
@@ -296,7 +300,7 @@ def delete_integration(integration: str):
 
 
 def delete_integrations(integrations: list[str]):
-    response = requests.get(
+    response = SESSION.get(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/settings/integration-commands",
         headers=headers)
     if response.status_code == 200:
@@ -312,9 +316,10 @@ def delete_integrations(integrations: list[str]):
 
 
 def delete_instance(instance_id: str):
-    response = requests.delete(
+    response = SESSION.delete(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/settings/integration/{instance_id}",
-        headers=headers)
+        headers=headers,
+        endpoint="/xsoar/public/v1/settings/integration/{id}")
 
     if response.status_code == 200:
         json_results = response.json()
@@ -323,7 +328,7 @@ def delete_instance(instance_id: str):
 
 
 def delete_integration_instances(instances: list[str]):
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/settings/integration/search",
         headers=headers,
         json={})
@@ -341,7 +346,7 @@ def delete_integration_instances(instances: list[str]):
 
 def delete_correlation_rules(correlation_rules: list[str]):
     for rule in correlation_rules:
-        response = requests.post(
+        response = SESSION.post(
             url=f"{DEMISTO_BASE_URL}/public_api/v1/correlations/delete",
             headers=headers,
             json={
@@ -469,6 +474,9 @@ def delete_threat_intel():
 
 
 if __name__ == "__main__":
-    delete_soc_content()
-    delete_threat_intel()
-    delete_config_automation_content()
+    try:
+        delete_soc_content()
+        delete_threat_intel()
+        delete_config_automation_content()
+    finally:
+        report()
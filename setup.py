@@ -1,21 +1,31 @@
+import hashlib
 import json
 import os
+import shutil
+import tempfile
 import time
 import webbrowser
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Union
 
-import requests
-from click.exceptions import Exit
 from dotenv import load_dotenv
 
-load_dotenv(dotenv_path='.env')
+from api_tracing import SESSION, report
 
-from demisto_sdk.commands.upload.upload import upload_content_entity
+load_dotenv(dotenv_path='.env')
 
 DEMISTO_BASE_URL = os.getenv("DEMISTO_BASE_URL", "")
 XSIAM_AUTH_ID = os.getenv("XSIAM_AUTH_ID", "")
 DEMISTO_API_KEY = os.getenv("DEMISTO_API_KEY", "")
 CONTENT_REPO_RAW_LINK = os.getenv("CONTENT_REPO_RAW_LINK", "")
+# "cached" uploads the pack zip built by a previous run, "sdk" packages and uploads the pack with demisto-sdk every run
+PACK_UPLOAD_MODE = os.getenv("PACK_UPLOAD_MODE", "cached").lower()
+PACK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pack_cache")
+
+# Upper bound on concurrent requests sent to the tenant during set-up
+MAX_CONCURRENT_REQUESTS = 8
 
 headers = {
     "x-xdr-auth-id": str(XSIAM_AUTH_ID),
@@ -44,7 +54,7 @@ def verify_credentials():
 
     :return: None, exits if incorrect credentials were received.
     """
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/settings/credentials",
         headers=headers,
         json={})
@@ -64,10 +74,99 @@ def verify_credentials():
         exit(-2)
 
 
+def pack_content_hash(path: str) -> str:
+    """
+    Hash the pack sources, so a pack artifact is only rebuilt when the files it's built from change
+
+    :param path: str, path of the pack directory
+    :return: sha256 hex digest of the pack's relative file paths and contents
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".pyc"):
+                continue
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).replace(os.sep, "/").encode())
+            digest.update(b"\0")
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def build_pack_artifact(path: str, cache_dir: str = PACK_CACHE_DIR) -> str:
+    """
+    Build the pack's uploadable zip once with demisto-sdk and reuse it until the pack sources change. The zip is
+    named after the content hash of the pack, so the same artifact is shared across runs and tenants.
+
+    :param path: str, path of the pack directory
+    :param cache_dir: str, directory the built zips are kept in
+    :return: path of the pack's zip
+    """
+    pack_name = os.path.basename(os.path.normpath(path))
+    zip_path = os.path.join(cache_dir, f"{pack_name}-{pack_content_hash(path)[:16]}.zip")
+    if os.path.isfile(zip_path):
+        print(f"Reusing the {pack_name} pack built at {zip_path}.")
+        return zip_path
+
+    # demisto-sdk takes seconds to import, so it's only imported by the steps that package content with it
+    from demisto_sdk.commands.common.constants import MarketplaceVersions
+    from demisto_sdk.commands.upload.constants import MULTIPLE_ZIPPED_PACKS_FILE_NAME
+    from demisto_sdk.commands.upload.upload import zip_multiple_packs
+
+    print(f"Building the {pack_name} pack.")
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as build_dir:
+        # demisto-sdk zips every pack into uploadable_packs.zip, the pack's own zip is what gets uploaded
+        zip_multiple_packs(paths=[Path(path)], marketplace=MarketplaceVersions.MarketplaceV2, dir=Path(build_dir))
+        with zipfile.ZipFile(os.path.join(build_dir, MULTIPLE_ZIPPED_PACKS_FILE_NAME)) as zf:
+            with zf.open(f"{pack_name}.zip") as src, open(f"{zip_path}.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+    os.replace(f"{zip_path}.tmp", zip_path)
+
+    # Only the artifact of the current sources is kept
+    for name in os.listdir(cache_dir):
+        if name.startswith(f"{pack_name}-") and name.endswith(".zip") and name != os.path.basename(zip_path):
+            os.remove(os.path.join(cache_dir, name))
+
+    return zip_path
+
+
+def upload_pack_zip(zip_path: str):
+    """
+    Upload a pack zip already built by demisto-sdk, without re-validating and re-zipping it
+
+    :param zip_path: str, path of the pack's zip
+    :return: None, raises if the tenant rejected the pack
+    """
+    with open(zip_path, "rb") as f:
+        response = SESSION.post(
+            url=f"{DEMISTO_BASE_URL}/xsoar/contentpacks/installed/upload",
+            headers=headers,
+            params={"skipVerify": "true", "skipValidation": "true"},
+            files={"file": (os.path.basename(zip_path), f, "application/zip")})
+
+    if response.status_code == 200:
+        print(f"Uploaded {os.path.basename(zip_path)}.")
+    else:
+        raise Exception(f"Failure when uploading the pack: {response.text}")
+
+
 def upload_initial_content():
 
     path = os.path.join(os.path.dirname(__file__), "Packs/POVContentPack")
 
+    # Upload the pack built by a previous run, unless demisto-sdk was asked to upload it
+    if PACK_UPLOAD_MODE != "sdk":
+        upload_pack_zip(build_pack_artifact(path))
+        return
+
+    from click.exceptions import Exit
+    from demisto_sdk.commands.upload.upload import upload_content_entity
+
     try:
         upload_content_entity(
             input=path,
@@ -101,7 +200,7 @@ def test_existing_instance(instance_dict: dict) -> bool:
         "Core REST API": verify_core_rest_api_values
     }
 
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/settings/integration/test",
         headers=headers,
         json=instance_dict)
@@ -128,34 +227,78 @@ def test_existing_instance(instance_dict: dict) -> bool:
         raise Exception(f"Failure when getting integration instances: {response.text}")
 
 
-def integration_instance_exists(brand: str) -> bool:
+def get_integration_instances() -> list:
     """
-    Given a brand, check the tenant for existing, enabled integration instances
+    Fetch every integration instance on the tenant with a single search request
 
-    :param brand: str
-    :return: True if enabled instance exists, False otherwise
+    :return: list of integration instance configurations
     """
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/settings/integration/search",
         headers=headers,
         json={})
 
     if response.status_code == 200:
         json_results = response.json()
-        instance_results = json_results.get("instances")
-
-        insts = [x for x in instance_results if x.get('brand') == brand and x.get('enabled') == 'true']
-        if len(insts) > 1:
-            raise Exception(f"More than one {brand} instance detected: {[x.get('name') for x in insts]}")
-        elif len(insts) == 0:
-            return False
-        elif len(insts) == 1:
-            return test_existing_instance(insts[0])
+        return json_results.get("instances") or []
     else:
         raise Exception(f"Failure when getting integration instances: {response.text}")
 
 
-def create_integration_instances():
+def index_enabled_instances(instances: list) -> dict:
+    """
+    Index the enabled integration instances by brand
+
+    :param instances: list of integration instance configurations, as returned by get_integration_instances
+    :return: dict mapping each brand to its enabled instances
+    """
+    instances_by_brand = {}
+    for instance in instances:
+        if instance.get('enabled') == 'true':
+            instances_by_brand.setdefault(instance.get('brand'), []).append(instance)
+    return instances_by_brand
+
+
+def integration_instance_exists(brand: str, instances_by_brand: dict) -> bool:
+    """
+    Given a brand, check the tenant inventory for existing, enabled integration instances
+
+    :param brand: str
+    :param instances_by_brand: dict, enabled instances indexed by brand, as returned by index_enabled_instances
+    :return: True if enabled instance exists, False otherwise
+    """
+    insts = instances_by_brand.get(brand, [])
+    if len(insts) > 1:
+        raise Exception(f"More than one {brand} instance detected: {[x.get('name') for x in insts]}")
+    elif len(insts) == 0:
+        return False
+    else:
+        return test_existing_instance(insts[0])
+
+
+def create_integration_instance(instance_def: dict):
+    """
+    Send the integration instance creation request for a single instance definition
+
+    :param instance_def: dict, integration instance's configuration
+    :return: None, raises if the tenant rejected the instance
+    """
+    brand = instance_def.get("brand")
+    response = SESSION.put(
+        url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/settings/integration",
+        headers=headers,
+        json=instance_def)
+
+    if response.status_code == 200:
+        print(f"Created {brand} integration instance.")
+    else:
+        if not "already exists" in response.text:
+            raise Exception(f"Failure: {response.text}")
+        else:
+            print("Could not update the existing integraiton instance.")
+
+
+def create_integration_instances(max_workers: int = MAX_CONCURRENT_REQUESTS):
 
     # Grab the Integration Instance Data for POV XSIAM Content Management
     path = os.path.join(os.path.dirname(__file__), "config_files/integration_instances.json")
@@ -170,28 +313,35 @@ def create_integration_instances():
         server_url_param = [x for x in params_list if x.get("name") == "url"][0]
         server_url_param["value"] = DEMISTO_BASE_URL
 
-        # Verify that there isn't an existing instance that's enabled for this integration
-        brand = instance_def.get("brand")
-        if brand:
-            already_exists = integration_instance_exists(brand)
-            if already_exists:
+    # Fetch the tenant's instances once, no matter how many instances are defined
+    instances_by_brand = index_enabled_instances(get_integration_instances())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Verify that there isn't an existing instance that's enabled for each integration, testing them concurrently
+        brands = {instance_def.get("brand") for instance_def in instance_def_list if instance_def.get("brand")}
+        exists_futures = {brand: executor.submit(integration_instance_exists, brand, instances_by_brand)
+                          for brand in brands}
+        existing_brands = {brand for brand, future in exists_futures.items() if future.result()}
+
+        # One instance per brand: concurrent requests for the same brand would all create an instance
+        to_create = []
+        planned = set()
+        for instance_def in instance_def_list:
+            brand = instance_def.get("brand")
+            if brand in existing_brands:
                 print(f"Not creating {brand} integration instance because an enabled instance already exists.")
                 continue
+            key = brand or instance_def.get("name")
+            if key in planned:
+                print(f"Not creating {instance_def.get('name')} integration instance because another {key} "
+                      f"instance is defined before it.")
+                continue
+            planned.add(key)
+            to_create.append(instance_def)
 
-        # Send integration instance creation request
-        response = requests.put(
-            url=f"{DEMISTO_BASE_URL}/xsoar/public/v1/settings/integration",
-            headers=headers,
-            json=instance_def)
-
-        if response.status_code == 200:
-            json_results = response.json()
-            print(f"Created {brand} integration instance.")
-        else:
-            if not "already exists" in response.text:
-                raise Exception(f"Failure: {response.text}")
-            else:
-                print("Could not update the existing integraiton instance.")
+        # Send the integration instance creation requests concurrently
+        for future in [executor.submit(create_integration_instance, instance_def) for instance_def in to_create]:
+            future.result()
 
 
 def get_custom_alerts(external_id):
@@ -223,7 +373,7 @@ def get_custom_alerts(external_id):
         }
     }
 
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/public_api/v1/alerts/get_alerts",
         headers=headers,
         json=data)
@@ -275,7 +425,7 @@ def create_custom_alert() -> Union[str, None]:
         }
     }
 
-    response = requests.post(
+    response = SESSION.post(
         url=f"{DEMISTO_BASE_URL}/public_api/v1/alerts/create_alert",
         headers=headers,
         json=data)
@@ -352,5 +502,9 @@ def main():
     webbrowser.open(url)
 
 
-main()
-print("Completed.")
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        report()
+    print("Completed.")